@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+'''
+    ChildBoomBox per-play spawn versus daemon mode, in ms of overhead.
+
+    A stand-in shell script poses as aplay, so no sound card is needed:
+    given a file it sleeps for the sound's length, given stdin it drains it.
+    Overhead is the time per waited play, less the sound's length.
+
+    ::
+
+        python3 bench/bench_child_daemon.py [plays]
+'''
+import os
+import stat
+import sys
+import wave
+from os.path import dirname, join
+from statistics import mean, median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+import boombox  # noqa: E402
+
+DURATION_MS = 20
+STAND_IN = '''#!/bin/sh
+# stand-in player: drains raw PCM on stdin, or "plays" a file by sleeping
+for last; do :; done
+if [ "$last" = - ]; then exec cat > /dev/null; fi
+exec sleep %s
+'''
+
+
+def setup(tmpdir):
+    ''' Write the stand-in player and a short tone, return their paths. '''
+    player = join(tmpdir, 'aplay')
+    with open(player, 'w') as outfile:
+        outfile.write(STAND_IN % (DURATION_MS / 1000))
+    os.chmod(player, os.stat(player).st_mode | stat.S_IXUSR)
+
+    sound_file = join(tmpdir, 'tone.wav')
+    with wave.open(sound_file, 'wb') as outfile:
+        outfile.setnchannels(1)
+        outfile.setsampwidth(2)
+        outfile.setframerate(22_050)
+        outfile.writeframes(boombox.render_tone(440, DURATION_MS,
+                                                sample_width=2))
+    return player, sound_file
+
+
+def measure(box, plays):
+    box.play()  # warm up
+    results = []
+    for _ in range(plays):
+        start = perf_counter()
+        box.play()
+        results.append((perf_counter() - start) * 1000 - DURATION_MS)
+    return results
+
+
+def main():
+    if os.name == 'nt':
+        sys.exit('a POSIX shell is required for the stand-in player.')
+    plays = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    with TemporaryDirectory() as tmpdir:
+        player, sound_file = setup(tmpdir)
+        print('sound: %s ms, plays: %s' % (DURATION_MS, plays))
+        print('%-10s %10s %10s %10s' % ('mode', 'mean ms', 'median ms',
+                                        'max ms'))
+        for label, daemon in (('spawn', False), ('daemon', True)):
+            box = boombox.ChildBoomBox(sound_file, wait=True,
+                                       binary_path=player, daemon=daemon)
+            times = measure(box, plays)
+            print('%-10s %10.2f %10.2f %10.2f' % (label, mean(times),
+                                                  median(times), max(times)))
+        boombox._close_player_daemons()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+'''
+    GstBoomBox play-to-first-sample latency, fresh vs. prerolled pipelines.
+
+    Plays a sound repeatedly into a headless sink and times from the
+    play() call to the first buffer rendered.  With fakesink that is its
+    handoff signal, with filesink a buffer probe on its sink pad.
+    Needs python3-gi and Gstreamer, but no sound card.
+
+    ::
+
+        python3 bench/bench_gst_latency.py [sound_file] [fakesink|filesink]
+'''
+import sys
+from os.path import dirname, join
+from statistics import mean, median
+from threading import Event
+from time import perf_counter
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+import boombox  # noqa: E402
+
+REPEATS = 20
+SINKS = dict(
+    fakesink='fakesink sync=true signal-handoffs=true',
+    filesink='filesink location=/dev/null',
+)
+
+
+def attach_timer(box, sink_name):
+    ''' Hook the sink so the first rendered buffer stamps the time. '''
+    Gst = boombox._gst()
+    sink = box._playbin.props.audio_sink
+    first = Event()
+    stamp = []
+
+    def mark(*args):
+        if not first.is_set():
+            stamp.append(perf_counter())
+            first.set()
+        return Gst.PadProbeReturn.OK
+
+    if sink_name == 'fakesink':
+        sink.connect('handoff', mark)
+    else:
+        sink.get_static_pad('sink').add_probe(Gst.PadProbeType.BUFFER, mark)
+    return first, stamp
+
+
+def measure(sound_file, sink_name, preroll):
+    box = boombox.GstBoomBox(sound_file, preroll=preroll,
+                             audio_sink=SINKS[sink_name])
+    if box._playbin is None:  # built on first play, wanted now
+        box._acquire()
+    first, stamp = attach_timer(box, sink_name)
+    results = []
+    for _ in range(REPEATS):
+        box.stop()
+        box._playbin.get_state(box._gst.CLOCK_TIME_NONE)  # settle
+        first.clear()
+        stamp.clear()
+        start = perf_counter()
+        box.play()
+        if not first.wait(5):
+            raise RuntimeError('no buffer reached the sink.')
+        results.append((stamp[0] - start) * 1000)
+    box.stop()
+    box.close()
+    return results
+
+
+def main():
+    if 'gstreamer' not in boombox.backends():
+        sys.exit('python3-gi with Gstreamer 1.0 is required.')
+    sound_file = sys.argv[1] if len(sys.argv) > 1 else boombox._example_file
+    sink_name = sys.argv[2] if len(sys.argv) > 2 else 'fakesink'
+
+    print('sound:', sound_file, ' sink:', sink_name)
+    print('%-12s %10s %10s %10s' % ('pipeline', 'mean ms', 'median ms',
+                                    'max ms'))
+    for label, preroll in (('fresh', False), ('prerolled', True)):
+        times = measure(sound_file, sink_name, preroll)
+        print('%-12s %10.2f %10.2f %10.2f' % (label, mean(times),
+                                              median(times), max(times)))
+
+
+if __name__ == '__main__':
+    main()
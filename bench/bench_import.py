@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+'''
+    Cold-start cost of ``import boombox``, in milliseconds.
+
+    Each sample is a fresh interpreter, measured against a bare one, so the
+    result is what boombox itself adds.  Also checks that no audio library
+    was pulled in at import.  Exits non-zero over the optional limit::
+
+        python3 bench/bench_import.py [max_ms]
+'''
+import subprocess
+import sys
+from os.path import abspath, dirname, join
+from statistics import median
+
+REPEATS = 15
+HEAVY = ('gi', 'pyaudio', 'numpy', 'AppKit', 'winsound', 'audioop')
+SRC_DIR = abspath(join(dirname(__file__), '..'))
+PROBE = '''
+import sys
+from time import perf_counter
+sys.path.insert(0, %r)
+start = perf_counter()
+%s
+print((perf_counter() - start) * 1000)
+print(' '.join(name for name in %r if name in sys.modules))
+'''
+
+
+def sample(statement):
+    ''' Run statement in a new interpreter, return (ms, heavy modules). '''
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE % (SRC_DIR, statement, HEAVY)],
+        check=True, stdout=subprocess.PIPE, universal_newlines=True,
+    ).stdout.splitlines()
+    return float(output[0]), output[1:] and output[1].split()
+
+
+def main():
+    limit = float(sys.argv[1]) if len(sys.argv) > 1 else None
+    sample('import boombox')  # warm the bytecode cache
+
+    times, loaded = [], set()
+    for _ in range(REPEATS):
+        elapsed, heavy = sample('import boombox')
+        times.append(elapsed)
+        loaded.update(heavy)
+    baseline = median(sample('pass')[0] for _ in range(REPEATS))
+    result = median(times) - baseline
+
+    print('import boombox: %.2f ms median, %.2f ms min (of %s)'
+          % (result, min(times) - baseline, REPEATS))
+    if loaded:
+        print('loaded at import:', ' '.join(sorted(loaded)))
+    if loaded or (limit is not None and result > limit):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
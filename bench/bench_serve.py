@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+'''
+    PlayerServer client cost: CPU per request() in µs, and round trips.
+
+    Serves from a thread of this process, with a stand-in shell script
+    posing as aplay, so no sound card is needed.  Client CPU is measured
+    with the calling thread's clock, so the server's work isn't counted.
+
+    ::
+
+        python3 bench/bench_serve.py [requests]
+'''
+import os
+import sys
+from os.path import dirname, join
+from statistics import mean, median
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter, sleep, thread_time
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+import boombox  # noqa: E402
+from bench_child_daemon import setup  # noqa: E402, the stand-in
+
+
+def main():
+    if os.name == 'nt':
+        sys.exit('Unix sockets and a POSIX shell are required.')
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+
+    with TemporaryDirectory() as tmpdir:
+        player, sound_file = setup(tmpdir)
+        server = boombox.PlayerServer(join(tmpdir, 'boombox.sock'),
+                                      'child', binary_path=player)
+        Thread(target=server.serve_forever, daemon=True).start()
+        request = lambda *words, **kwargs: boombox.request(  # noqa: E731
+            *words, path=server.path, **kwargs)
+        request('stats', reply=True)  # warm up
+
+        start = thread_time()
+        for _ in range(count):
+            request('stop')
+        client_us = (thread_time() - start) * 1e6 / count
+
+        trips = []
+        for _ in range(min(count, 200)):
+            start = perf_counter()
+            request('play', sound_file, reply=True)
+            trips.append((perf_counter() - start) * 1000)
+        sleep(.1)
+        stats = server.stats()
+        server.close()
+
+    print('requests: %s, client CPU: %.1f µs each, without answer'
+          % (count, client_us))
+    print('round trip with answer: %.2f ms mean, %.2f ms median'
+          % (mean(trips), median(trips)))
+    print('server handled: %s, %.2f ms mean, %.2f ms max, errors: %s'
+          % (stats['requests'], stats['handle_ms'], stats['handle_max_ms'],
+             stats['errors']))
+
+
+if __name__ == '__main__':
+    main()
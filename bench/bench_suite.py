@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+'''
+    Backend benchmark suite, headless, with results written as JSON.
+
+    Each backend plays into something that needs no sound card:
+
+        gstreamer   A fakesink, or filesink to /dev/null, via audio_sink.
+        pyaudio     A null PortAudio, standing in for the pyaudio module,
+                    that paces its callbacks in real time and drops the
+                    audio.  --portaudio uses the real one instead.
+        child       A stand-in shell script posing as aplay.
+
+    Measured: import time, construction, play-to-first-sample latency,
+    memory per live instance, and concurrent sounds; plus tone synthesis
+    throughput, which needs no backend.  Backends that aren't installed
+    are recorded as skipped.  Keep the JSON to compare releases::
+
+        python3 bench/bench_suite.py [-o results.json] [-b pyaudio,child]
+'''
+import argparse
+import json
+import os
+import platform
+import stat
+import sys
+import tracemalloc
+import types
+import wave
+from importlib.machinery import ModuleSpec
+from importlib.util import find_spec
+from os.path import dirname, join
+from statistics import mean, median
+from tempfile import TemporaryDirectory
+from threading import Event, Thread, get_ident
+from time import perf_counter, sleep, strftime
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+import boombox  # noqa: E402
+from bench_import import sample as import_sample  # noqa: E402
+
+SOUND_MS = 250
+LONG_SOUND_MS = 3_000  # outlasts the concurrency ramp
+MAX_CONCURRENT = 64
+TIMEOUT = 5
+SINKS = dict(
+    fakesink='fakesink sync=true',
+    filesink='filesink location=%s sync=true' % os.devnull,
+)
+STAND_IN = '''#!/bin/sh
+# stand-in player: drains raw PCM on stdin, or "plays" a file by sleeping,
+# after signalling its start on a fifo, if given one
+for last; do :; done
+if [ "$last" = - ]; then exec cat > /dev/null; fi
+if [ -n "$BENCH_FIFO" ]; then echo > "$BENCH_FIFO"; fi
+exec sleep "${BENCH_SLEEP:-%s}"
+'''
+
+
+# ---- Null PortAudio ---------------------------------------------------------
+class NullStream:
+    ''' A PortAudio stream without a device.  The callback is called from a
+        thread, a buffer per period of real time, as a sound card would.
+    '''
+    def __init__(self, rate, channels, format, start=True,
+                 frames_per_buffer=0, stream_callback=None, **kwargs):
+        self._frame_size = channels * NullPortAudio.sizes[format]
+        self._bytes_per_sec = rate * self._frame_size
+        self._frames = frames_per_buffer or 512  # paFramesPerBufferUnspecified
+        self._period = self._frames / rate
+        self._callback = stream_callback
+        self._thread = None
+        self._running = self._active = False
+        if start:
+            self.start_stream()
+
+    def start_stream(self):
+        self._running = self._active = True
+        if self._callback:
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        deadline = perf_counter()
+        while self._running:
+            data, flag = self._callback(None, self._frames, {}, 0)
+            if not self._check(data) or flag != NullPortAudio.paContinue:
+                break
+            deadline += self._period
+            sleep(max(0, deadline - perf_counter()))
+        self._active = False
+
+    def _check(self, data):
+        ''' Check a callback's payload as PyAudio does, which takes bytes or
+            None only, at most a buffer long, and aborts the stream on
+            anything else.
+        '''
+        if data is None:
+            return True
+        if not isinstance(data, bytes):
+            error = 'callback returned %s, not bytes' % type(data).__name__
+        elif len(data) > self._frames * self._frame_size:
+            error = 'callback returned %d bytes for a buffer of %d' % (
+                len(data), self._frames * self._frame_size)
+        else:
+            return True
+        NullPortAudio.errors.append(error)
+        print('NullStream: stream aborted,', error, file=sys.stderr)
+        return False
+
+    def write(self, frames, num_frames=None, exception_on_underflow=False):
+        sleep(len(frames) / self._bytes_per_sec)  # blocks, as the real one
+
+    def stop_stream(self):
+        self._running = self._active = False
+        thread, self._thread = self._thread, None
+        if thread and thread.ident != get_ident():
+            thread.join()
+
+    def close(self):
+        self.stop_stream()
+
+    def is_active(self):
+        return self._active
+
+    def is_stopped(self):
+        return not self._running
+
+    def get_output_latency(self):
+        return self._period
+
+
+class NullPortAudio:
+    ''' Enough of pyaudio.PyAudio for boombox, with one null device. '''
+    paFloat32, paInt32, paInt24, paInt16, paInt8, paUInt8 = 1, 2, 4, 8, 16, 32
+    paContinue, paComplete, paAbort = 0, 1, 2
+    paOutputUnderflow, paOutputOverflow = 4, 8
+    sizes = {1: 4, 2: 4, 4: 3, 8: 2, 16: 1, 32: 1}
+    errors = []  # aborted callback payloads, across all streams
+    device = dict(index=0, name='null', maxOutputChannels=2,
+                  defaultSampleRate=48_000.0, defaultLowOutputLatency=0.01,
+                  defaultHighOutputLatency=0.1)
+
+    def open(self, **kwargs):
+        return NullStream(**kwargs)
+
+    def terminate(self):
+        pass
+
+    def get_format_from_width(self, width, unsigned=True):
+        return get_format_from_width(width, unsigned)
+
+    def get_sample_size(self, format):
+        return self.sizes[format]
+
+    def get_device_count(self):
+        return 1
+
+    def get_device_info_by_index(self, index):
+        return dict(self.device)
+
+    def get_default_output_device_info(self):
+        return dict(self.device)
+
+
+def get_format_from_width(width, unsigned=True):
+    if width == 1:
+        return NullPortAudio.paUInt8 if unsigned else NullPortAudio.paInt8
+    return {2: NullPortAudio.paInt16, 3: NullPortAudio.paInt24,
+            4: NullPortAudio.paFloat32}[width]
+
+
+def install_null_portaudio():
+    ''' Put the null PortAudio in place of pyaudio, before boombox uses it. '''
+    module = types.ModuleType('pyaudio', NullPortAudio.__doc__)
+    module.__spec__ = ModuleSpec('pyaudio', None)  # for find_spec()
+    module.PyAudio = NullPortAudio
+    module.get_format_from_width = get_format_from_width
+    for name in dir(NullPortAudio):
+        if name.startswith('pa'):
+            setattr(module, name, getattr(NullPortAudio, name))
+    sys.modules['pyaudio'] = module
+    boombox._available.cache_clear()
+
+
+# ---- Fixtures ---------------------------------------------------------------
+def write_wav(path, duration_ms):
+    with wave.open(path, 'wb') as outfile:
+        outfile.setnchannels(1)
+        outfile.setsampwidth(2)
+        outfile.setframerate(22_050)
+        outfile.writeframes(boombox.render_tone(440, duration_ms,
+                                                sample_width=2))
+    return path
+
+
+def write_stand_in(tmpdir):
+    player = join(tmpdir, 'aplay')
+    with open(player, 'w') as outfile:
+        outfile.write(STAND_IN % (SOUND_MS / 1000))
+    os.chmod(player, os.stat(player).st_mode | stat.S_IXUSR)
+    return player
+
+
+def summary(values):
+    ''' Reduce a list of ms to what's worth keeping. '''
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return dict(n=len(values), mean=round(mean(values), 3),
+                median=round(median(values), 3), min=round(min(values), 3),
+                max=round(max(values), 3))
+
+
+def rss_bytes():
+    ''' Resident set size of this process, where /proc has it. '''
+    try:
+        with open('/proc/self/statm') as infile:
+            return int(infile.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def discard(box):
+    ''' Stop a player and let go of what it holds. '''
+    child = getattr(box, '_child', None)
+    if child or not isinstance(box, boombox.ChildBoomBox):
+        box.stop()  # a child never started has nothing to stop
+    if child:
+        child.wait()  # no zombies
+    if hasattr(box, 'close'):
+        box.close()
+
+
+def is_playing(box):
+    child = getattr(box, '_child', None)
+    if child:
+        return child.poll() is None
+    return not box._ended.is_set()
+
+
+# ---- Measurements -----------------------------------------------------------
+def measure_imports(repeats):
+    ''' Cold import of boombox, and of each installed backend's library. '''
+    import_sample('import boombox')  # warm the bytecode cache
+    baseline = median(import_sample('pass')[0] for _ in range(repeats))
+    statements = dict(boombox='import boombox')
+    if find_spec('gi'):
+        statements['gstreamer'] = 'import boombox; boombox._gst()'
+    if find_spec('pyaudio'):
+        statements['pyaudio'] = 'import boombox, pyaudio'
+    results = {}
+    for name, statement in statements.items():
+        times = [import_sample(statement)[0] - baseline
+                 for _ in range(repeats)]
+        results[name] = summary(times)
+    results['loaded_at_import'] = import_sample('import boombox')[1]
+    return results
+
+
+def measure_synthesis(repeats):
+    ''' Samples per second, rendering tones and a DTMF sequence. '''
+    results = dict(numpy=bool(boombox._numpy()))
+    jobs = dict(
+        tone_8bit=(boombox.render_tone, (440, 2_000),
+                   dict(sample_rate=48_000)),
+        tone_16bit=(boombox.render_tone, (440, 2_000),
+                    dict(sample_rate=48_000, sample_width=2)),
+        dtmf_16bit=(boombox.render_sequence, (boombox.dtmf('5551234567'),),
+                    dict(sample_rate=48_000, sample_width=2)),
+    )
+    for name, (func, args, kwargs) in jobs.items():
+        start = perf_counter()
+        for _ in range(repeats):
+            data = func(*args, **kwargs)
+        elapsed = (perf_counter() - start) / repeats
+        samples = len(data) // kwargs.get('sample_width', 1)
+        results[name] = dict(samples_per_sec=round(samples / elapsed),
+                             ms=round(elapsed * 1000, 3))
+    return results
+
+
+def measure_construction(make, repeats):
+    times = []
+    for _ in range(repeats):
+        start = perf_counter()
+        box = make()
+        times.append((perf_counter() - start) * 1000)
+        discard(box)
+    return summary(times)
+
+
+def measure_latency(make, repeats, timed_play):
+    ''' Time from play() to the first sample leaving for the "device". '''
+    times = []
+    box = make()
+    try:
+        for _ in range(repeats + 1):  # the first warms up
+            times.append(timed_play(box))
+            box.stop()
+            child = getattr(box, '_child', None)
+            if child:
+                child.wait()
+    finally:
+        discard(box)
+    return summary(times[1:])
+
+
+def measure_memory(make, count):
+    ''' Python heap, and where known the process RSS, per live instance. '''
+    discard(make())  # first-use costs aren't per instance
+    tracemalloc.start()
+    rss_before = rss_bytes()
+    before = tracemalloc.take_snapshot()
+    boxes = [make() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    rss_after = rss_bytes()
+    tracemalloc.stop()
+    heap = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    for box in boxes:
+        discard(box)
+    return dict(
+        instances=count,
+        python_bytes=heap // count,
+        rss_bytes=(rss_after - rss_before) // count if rss_before else None,
+    )
+
+
+def measure_concurrency(make, cap):
+    ''' Start long sounds until one fails or the cap, count those playing. '''
+    boxes, error = [], None
+    start = perf_counter()
+    try:
+        while len(boxes) < cap:
+            box = make()
+            boxes.append(box)
+            box.play()
+    except Exception as err:  # the limit, whatever form it takes
+        error = '%s: %s' % (err.__class__.__name__, err)
+    elapsed = perf_counter() - start
+    sleep(0.1)
+    playing = sum(is_playing(box) for box in boxes)
+    for box in boxes:
+        try:
+            discard(box)
+        except Exception:
+            pass
+    return dict(cap=cap, started=len(boxes), playing=playing, error=error,
+                ms_per_start=round(elapsed * 1000 / max(1, len(boxes)), 3))
+
+
+def run_backend(name, make, make_long, timed_play, args):
+    log = lambda message: print('  %-12s %s' % (name, message))  # noqa: E731
+    result = {}
+    log('construction')
+    result['construction_ms'] = measure_construction(make, args.repeats)
+    if timed_play:
+        log('first sample')
+        result['first_sample_ms'] = measure_latency(make, args.repeats,
+                                                    timed_play)
+    log('memory')
+    result['memory'] = measure_memory(make, args.instances)
+    log('concurrency')
+    result['concurrency'] = measure_concurrency(make_long, args.concurrent)
+    return result
+
+
+# ---- Backends ---------------------------------------------------------------
+def stats_timed_play():
+    ''' Play, and wait for the player's own first_buffer_ms measurement. '''
+    events = {}
+
+    def hook(player, name, value):
+        if name == 'first_buffer_ms':
+            events.setdefault(id(player), Event()).set()
+
+    def timed_play(box):
+        event = events.setdefault(id(box), Event())
+        event.clear()
+        box.play()
+        if not event.wait(TIMEOUT):
+            raise TimeoutError('no first buffer from %r' % box)
+        return box.stats.first_buffer_ms
+
+    boombox.instrument(hook=hook)
+    return timed_play
+
+
+def fifo_timed_play(fifo):
+    ''' Play, and wait for the stand-in player to signal on the fifo. '''
+    def timed_play(box):
+        reader = Thread(target=lambda: open(fifo).read(), daemon=True)
+        reader.start()
+        os.environ['BENCH_FIFO'] = fifo  # only now, or players would block
+        try:
+            start = perf_counter()
+            box.play()
+            reader.join(TIMEOUT)
+            elapsed = (perf_counter() - start) * 1000
+        finally:
+            del os.environ['BENCH_FIFO']
+        if reader.is_alive():
+            raise TimeoutError('stand-in player did not start.')
+        return elapsed
+    return timed_play
+
+
+def backends(args, tmpdir):
+    ''' Yield (name, make, make_long, timed_play) per variant, or
+        (name, reason) for those skipped.
+    '''
+    sound = write_wav(join(tmpdir, 'tone.wav'), SOUND_MS)
+    long_sound = write_wav(join(tmpdir, 'long.wav'), LONG_SOUND_MS)
+    timed_play = stats_timed_play()
+
+    if 'gstreamer' in args.backends:
+        if 'gstreamer' in boombox.backends():
+            cls, sink = boombox.GstBoomBox, SINKS[args.sink]
+            for label, kwargs in (('gstreamer', {}),
+                                  ('gstreamer+preroll', dict(preroll=True))):
+                yield (label,
+                       lambda kw=kwargs: cls(sound, audio_sink=sink, **kw),
+                       lambda kw=kwargs: cls(long_sound, audio_sink=sink,
+                                             **kw),
+                       timed_play)
+        else:
+            yield 'gstreamer', 'python3-gi / Gstreamer not installed'
+
+    if 'pyaudio' in args.backends:
+        if not args.portaudio:
+            install_null_portaudio()
+        if 'pyaudio' in boombox.backends():
+            cls = boombox.PyAudioBoomBox
+            for label, kwargs in (('pyaudio', {}),
+                                  ('pyaudio+mixer', dict(mixer=True))):
+                yield (label, lambda kw=kwargs: cls(sound, **kw),
+                       lambda kw=kwargs: cls(long_sound, **kw), timed_play)
+        else:
+            yield 'pyaudio', 'pyaudio not installed'
+
+    if 'child' in args.backends:
+        if os.name == 'posix':
+            cls, player = boombox.ChildBoomBox, write_stand_in(tmpdir)
+            fifo = join(tmpdir, 'started')
+            os.mkfifo(fifo)
+            os.environ['BENCH_SLEEP'] = str(LONG_SOUND_MS / 1000)
+            yield ('child', lambda: cls(sound, binary_path=player),
+                   lambda: cls(long_sound, binary_path=player),
+                   fifo_timed_play(fifo))
+            yield ('child+daemon',
+                   lambda: cls(sound, binary_path=player, daemon=True),
+                   lambda: cls(long_sound, binary_path=player, daemon=True),
+                   None)  # one process, its start isn't per play
+        else:
+            yield 'child', 'a POSIX shell is required for the stand-in'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-o', '--output', default='bench-results.json',
+                        help='where to write the JSON, - for stdout')
+    parser.add_argument('-b', '--backends', default='gstreamer,pyaudio,child',
+                        type=lambda value: value.split(','),
+                        help='comma-separated, default: %(default)s')
+    parser.add_argument('-n', '--repeats', type=int, default=20)
+    parser.add_argument('--instances', type=int, default=50,
+                        help='live instances for the memory figure')
+    parser.add_argument('--concurrent', type=int, default=MAX_CONCURRENT,
+                        help='cap on concurrent sounds, default: %(default)s')
+    parser.add_argument('--sink', choices=sorted(SINKS), default='fakesink',
+                        help='Gstreamer sink')
+    parser.add_argument('--portaudio', action='store_true',
+                        help='use the real PortAudio, needs a device')
+    args = parser.parse_args()
+
+    results = dict(
+        meta=dict(
+            date=strftime('%Y-%m-%dT%H:%M:%S%z'),
+            boombox=boombox.__version__,
+            python=platform.python_version(),
+            platform=platform.platform(),
+            machine=platform.machine(),
+            args=vars(args),
+        ),
+    )
+    print('import time')
+    results['import_ms'] = measure_imports(args.repeats)
+    print('synthesis')
+    results['synthesis'] = measure_synthesis(args.repeats)
+
+    print('backends')
+    results['backends'] = found = {}
+    with TemporaryDirectory() as tmpdir:
+        for name, *rest in backends(args, tmpdir):
+            if len(rest) == 1:
+                print('  %-12s skipped: %s' % (name, rest[0]))
+                found[name] = dict(skipped=rest[0])
+                continue
+            try:
+                found[name] = run_backend(name, *rest, args)
+            except Exception as err:
+                print('  %-12s failed: %s' % (name, err))
+                found[name] = dict(failed='%s: %s' % (
+                    err.__class__.__name__, err))
+        boombox._close_player_daemons()
+    if NullPortAudio.errors:
+        print('callback errors:', len(NullPortAudio.errors))
+    results['callback_errors'] = NullPortAudio.errors
+
+    text = json.dumps(results, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as outfile:
+            outfile.write(text + '\n')
+        print('written:', args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+'''
+    Tone synthesis throughput, in samples generated per second.
+
+    Compares the original per-sample generator of PyAudioBoomBox.play_tone
+    with boombox.render_tone.  No sound card is needed, nothing is played.
+
+    ::
+
+        python3 bench/bench_tone.py
+'''
+import sys
+from math import sin, tau
+from os.path import dirname, join
+from time import perf_counter
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+import boombox  # noqa: E402
+
+REPEATS = 10
+TONES = (  # frequency_hz, duration_ms, sample_rate, sample_width
+    (500, 2_000, 22_050, 1),
+    (440, 2_000, 48_000, 1),
+    (440, 2_000, 48_000, 2),
+    (1_234.5, 500, 44_100, 2),
+)
+
+
+def legacy_tone(freq, duration_ms, volume, sample_rate):
+    ''' The original generator, writes swapped for a list. '''
+    duration = duration_ms/1000
+    num_samples = int(sample_rate * duration)
+    rest_frames = num_samples % sample_rate
+    sample = lambda i: volume * sin(tau * freq * i / sample_rate)
+    samples = (int(sample(i) * 0x7F + 0x80) for i in range(num_samples))
+    out = [bytes(buf) for buf in zip( *([samples] * sample_rate) )]
+    out.append(b'\x80' * rest_frames)
+    return out
+
+
+def measure(func, *args):
+    start = perf_counter()
+    for _ in range(REPEATS):
+        func(*args)
+    return (perf_counter() - start) / REPEATS
+
+
+def main():
+    print('numpy:', bool(boombox._numpy()))
+    print('%-28s %14s %14s %8s' % ('tone', 'before s/sec', 'after s/sec',
+                                   'x'))
+    for freq, duration_ms, rate, width in TONES:
+        num_samples = int(rate * duration_ms / 1000)
+        if width == 1:
+            before = num_samples / measure(legacy_tone, freq, duration_ms,
+                                           .2, rate)
+        else:  # legacy had no 16-bit support
+            before = None
+        boombox._wavetable.cache_clear()  # first run builds the table
+        after = num_samples / measure(boombox.render_tone, freq,
+                                      duration_ms, .2, rate, width)
+        label = '%shz %sms @%s/%sb' % (freq, duration_ms, rate, width * 8)
+        print('%-28s %14s %14.0f %8s' % (
+            label,
+            '%.0f' % before if before else '-',
+            after,
+            '%.1f' % (after / before) if before else '-',
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,417 +15,3943 @@
         # Tones
         boombox.play_tone(sound_file, wait=True)
 '''
+import atexit
 import logging
 import os
 import sys
-from os.path import abspath, exists, join
-from time import sleep as _sleep
+from collections import namedtuple
+from functools import lru_cache
+from math import gcd, sin, tau
+from os.path import abspath, join
+from time import monotonic, perf_counter, sleep as _sleep
 
 
 log = logging.getLogger(__name__)
 __version__ = '0.56'
 
 
+# ---- Synthesis -------------------------------------------------------------
+_SAMPLE_TYPES = {1: 'B', 2: 'h'}  # width: array typecode, u8 & s16
+
+
+def _check_width(sample_width):
+    if sample_width not in _SAMPLE_TYPES:
+        raise ValueError('sample_width must be one of: %s'
+                         % ', '.join(map(str, _SAMPLE_TYPES)))
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    ''' Return the numpy module if installed, else None.  Checked once. '''
+    try:
+        import numpy  # deferred, heavy
+    except ImportError:
+        numpy = None
+    log.debug('numpy available: %s', bool(numpy))
+    return numpy
+
+
+def _period(frequency_hz, sample_rate):
+    ''' Return the number of samples after which a sampled sine repeats.
+
+        A sine of p/q hz sampled at r hz lines up again every
+        q·r / gcd(q·r, p) samples, a whole number of cycles.
+    '''
+    from fractions import Fraction  # deferred
+
+    freq = Fraction(frequency_hz).limit_denominator(1000)
+    span = freq.denominator * sample_rate
+    return span // gcd(span, freq.numerator), float(freq)
+
+
+def _sine_samples(frequency_hz, volume, sample_rate, sample_width, count):
+    ''' Compute count samples the slow way, into an array. '''
+    from array import array  # deferred
+
+    step = tau * frequency_hz / sample_rate
+    if sample_width == 1:
+        values = (int(volume * sin(step * i) * 0x7F + 0x80)
+                  for i in range(count))
+    else:
+        values = (int(volume * sin(step * i) * 0x7FFF) for i in range(count))
+    samples = array(_SAMPLE_TYPES[sample_width], values)
+    if sample_width > 1 and sys.byteorder == 'big':
+        samples.byteswap()  # PCM is little-endian
+    return samples
+
+
+@lru_cache(maxsize=64)
+def _wavetable(frequency_hz, volume, sample_rate, sample_width, period):
+    ''' One exact repetition of the waveform, immutable for sharing. '''
+    samples = _sine_samples(frequency_hz, volume, sample_rate, sample_width,
+                            period)
+    return samples.tobytes()
+
+
+def render_tone(frequency_hz, duration_ms, volume=0.2, sample_rate=22050,
+                sample_width=1):
+    ''' Render a sine tone to a bytes object of mono PCM samples.
+
+        Arguments:
+
+            frequency_hz    integer or float hz
+            duration_ms     float milliseconds
+            volume          float 0…1
+            sample_rate     integer hz, ie (11_025, 22_050, 44_100, 48_000)
+            sample_width    1 for unsigned 8-bit, 2 for signed 16-bit LE
+
+        Samples are computed in bulk with NumPy when it is installed.
+        Otherwise a single repeat period is computed once (see _period)
+        and tiled out to length, a handful of C-level copies.
+    '''
+    _check_width(sample_width)
+    num_samples = int(sample_rate * duration_ms / 1000)
+
+    np = _numpy()
+    if np:
+        phase = np.arange(num_samples) * (tau * frequency_hz / sample_rate)
+        wave = np.sin(phase) * volume
+        if sample_width == 1:
+            return (wave * 0x7F + 0x80).astype(np.uint8).tobytes()
+        return (wave * 0x7FFF).astype('<i2').tobytes()
+
+    period, frequency_hz = _period(frequency_hz, sample_rate)
+    if period >= num_samples:  # no repeats to exploit
+        return _sine_samples(frequency_hz, volume, sample_rate, sample_width,
+                             num_samples).tobytes()
+
+    table = _wavetable(frequency_hz, volume, sample_rate, sample_width, period)
+    reps, rest = divmod(num_samples, period)
+    return b''.join((table * reps, memoryview(table)[:rest * sample_width]))
+
+
+_DTMF = {  # key: (row hz, column hz)
+    key: (row, column)
+    for row, keys in zip((697, 770, 852, 941),
+                         ('123A', '456B', '789C', '*0#D'))
+    for column, key in zip((1209, 1336, 1477, 1633), keys)
+}
+
+
+def dtmf(digits, tone_ms=100, gap_ms=60):
+    ''' Return a sequence of dual tones for a string of telephone keys,
+        for render_sequence.  Unknown characters, e.g. "-", are a pause.
+    '''
+    notes = []
+    for key in digits.upper():
+        notes.append((_DTMF.get(key, ()), tone_ms))
+        notes.append(((), gap_ms))
+    return notes[:-1]
+
+
+def _notes(notes):
+    ''' Normalize to ((hz, …), duration_ms) pairs, hashable for caching. '''
+    return tuple(
+        (tuple(hz for hz in freqs if hz) if isinstance(freqs, (tuple, list))
+         else (freqs,) if freqs else (), duration_ms)
+        for freqs, duration_ms in notes
+    )
+
+
+def _mix_tones(freqs, volume, sample_rate, count):
+    ''' Sum sines into count signed 16-bit samples, in an array. '''
+    from array import array  # deferred
+    from operator import add
+
+    mixed = array('h', bytes(count * 2))
+    if not freqs:
+        return mixed
+    level = volume / len(freqs)
+    for freq in freqs:
+        period, freq = _period(freq, sample_rate)
+        if period < count:
+            table = _wavetable(freq, level, sample_rate, 2, period)
+            reps, rest = divmod(count, period)
+            tone = array('h', b''.join((table * reps, table[:rest * 2])))
+        else:
+            tone = array('h', _sine_samples(freq, level, sample_rate, 2,
+                                            count).tobytes())
+        if sys.byteorder == 'big':
+            tone.byteswap()  # back from little-endian
+        mixed = array('h', map(add, mixed, tone))
+    return mixed
+
+
+def render_sequence(notes, volume=0.2, sample_rate=22050, sample_width=1,
+                    fade_ms=5):
+    ''' Render a sequence of tones into one bytes object of mono PCM.
+
+        Arguments:
+
+            notes           Iterable of (frequency_hz, duration_ms) pairs.
+                            Frequency may be a tuple of several to mix,
+                            e.g. DTMF, or None or () for a rest.
+            fade_ms         Ramp each note in and out, against clicks.
+            Others          As render_tone.
+
+        Note boundaries fall on the nearest sample to their running total
+        of milliseconds, so the whole is exact to a sample.
+        Export with: to_wav(data, AudioFormat(sample_rate, 1, sample_width))
+    '''
+    _check_width(sample_width)
+    notes = _notes(notes)
+    bounds, elapsed_ms = [0], 0
+    for _, duration_ms in notes:
+        elapsed_ms += duration_ms
+        bounds.append(round(elapsed_ms * sample_rate / 1000))
+    fade = int(fade_ms * sample_rate / 1000)
+
+    np = _numpy()
+    if np:
+        wave = np.zeros(bounds[-1])
+        for (freqs, _), start, end in zip(notes, bounds, bounds[1:]):
+            if not freqs or end <= start:
+                continue
+            phase = np.arange(end - start) * (tau / sample_rate)
+            note = wave[start:end]
+            for freq in freqs:
+                note += np.sin(phase * freq)
+            note *= volume / len(freqs)
+            ramp = min(fade, (end - start) // 2)
+            if ramp:
+                envelope = np.linspace(0, 1, ramp, endpoint=False)
+                note[:ramp] *= envelope
+                note[-ramp:] *= envelope[::-1]
+        if sample_width == 1:
+            return (wave * 0x7F + 0x80).astype(np.uint8).tobytes()
+        return (wave * 0x7FFF).astype('<i2').tobytes()
+
+    from array import array  # deferred
+
+    samples = array('h')
+    for (freqs, _), start, end in zip(notes, bounds, bounds[1:]):
+        note = _mix_tones(freqs, volume, sample_rate, end - start)
+        ramp = min(fade, (end - start) // 2)
+        for i in range(ramp if freqs else 0):  # only the edges
+            note[i] = note[i] * i // ramp
+            note[-1 - i] = note[-1 - i] * i // ramp
+        samples.extend(note)
+    if sample_width == 1:
+        return array('B', [(sample >> 8) + 0x80 for sample in samples]
+                     ).tobytes()
+    if sys.byteorder == 'big':
+        samples.byteswap()  # PCM is little-endian
+    return samples.tobytes()
+
+
+
+# ---- Caching ---------------------------------------------------------------
+class BufferCache:
+    ''' A bounded, thread-safe, least-recently-used cache of audio buffers.
+
+        Arguments:
+
+            max_bytes       Budget for the total size of the cached buffers.
+                            Oldest entries are evicted to stay under it.
+
+        The hits, misses, and evictions counters are kept as attributes.
+    '''
+    def __init__(self, max_bytes=8_388_608):
+        from collections import OrderedDict  # deferred
+        from threading import Lock
+
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, ', '.join(
+            '%s=%s' % pair for pair in self.stats().items()))
+
+    def get(self, key, default=None):
+        ''' Return the buffer stored at key and mark it recently used. '''
+        with self._lock:
+            try:
+                data = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        ''' Store a buffer, evicting the least recently used to make room.
+
+            Buffers larger than the whole budget are not stored.
+        '''
+        size = len(data)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            if size > self.max_bytes:
+                log.debug('buffer too large to cache: %s bytes', size)
+                return data
+
+            self._entries[key] = data
+            self.nbytes += size
+            self._evict()
+        return data
+
+    def fetch(self, key, render):
+        ''' Return the buffer at key, calling render() to create it on a miss.
+        '''
+        data = self.get(key)
+        if data is None:
+            data = self.put(key, render())
+        return data
+
+    def discard(self, key):
+        ''' Drop the buffer at key, if any. '''
+        with self._lock:
+            data = self._entries.pop(key, None)
+            if data is not None:
+                self.nbytes -= len(data)
+
+    def resize(self, max_bytes):
+        ''' Change the byte budget, evicting as needed. '''
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        ''' Return the counters and current size as a dictionary. '''
+        return dict(
+            entries=len(self._entries), nbytes=self.nbytes,
+            max_bytes=self.max_bytes, hits=self.hits, misses=self.misses,
+            evictions=self.evictions,
+        )
+
+    def _evict(self):  # lock held
+        entries = self._entries
+        while self.nbytes > self.max_bytes and entries:
+            key, data = entries.popitem(last=False)
+            self.nbytes -= len(data)
+            self.evictions += 1
+            log.debug('evicted: %r', key)
+
+
+tone_cache = BufferCache()  # shared by all players
+
+
+def get_tone(frequency_hz, duration_ms, volume=0.2, sample_rate=22050,
+             sample_width=1, cache=tone_cache):
+    ''' Return rendered tone samples from cache, rendering on first use.
+
+        Arguments are the same as render_tone.  Pass cache=None to skip it.
+    '''
+    args = (frequency_hz, duration_ms, volume, sample_rate, sample_width)
+    if cache is None:
+        return render_tone(*args)
+    return cache.fetch(args, lambda: render_tone(*args))
+
+
+def get_sequence(notes, volume=0.2, sample_rate=22050, sample_width=1,
+                 fade_ms=5, cache=tone_cache):
+    ''' Return a rendered sequence from cache, rendering on first use.
+
+        Arguments are the same as render_sequence.
+    '''
+    args = (_notes(notes), volume, sample_rate, sample_width, fade_ms)
+    if cache is None:
+        return render_sequence(*args)
+    return cache.fetch(('sequence',) + args, lambda: render_sequence(*args))
+
+
+
+# ---- Audio data ------------------------------------------------------------
+_AudioFormat = namedtuple('AudioFormat', 'sample_rate channels sample_width')
+
+
+class AudioFormat(_AudioFormat):
+    ''' Layout of interleaved PCM: frames/sec, channels, bytes per sample. '''
+    __slots__ = ()
+
+    @property
+    def frame_size(self):
+        return self.channels * self.sample_width
+
+
+class PCMBuffer:
+    ''' In-memory PCM audio with a frame cursor, read by the audio callbacks.
+
+        Arguments:
+
+            data            A bytes-like object of interleaved samples.
+            format          An AudioFormat describing them.
+
+        read() returns memoryview slices, no copies are made.
+    '''
+    def __init__(self, data, format):
+        frame_size = format.frame_size
+        data = memoryview(data).cast('B')
+        size = len(data) - len(data) % frame_size  # whole frames only
+        self.data = data[:size]
+        self.format = format
+        self.frames = size // frame_size
+        self._frame_size = frame_size
+        self._pos = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __repr__(self):
+        return '%s(%s frames, %s)' % (self.__class__.__name__, self.frames,
+                                      self.format)
+
+    def read(self, frame_count):
+        ''' Return up to frame_count frames as a memoryview, advancing. '''
+        start = self._pos
+        self._pos = end = min(start + frame_count, self.frames)
+        return self.data[start * self._frame_size:end * self._frame_size]
+
+    def rewind(self):
+        self._pos = 0
+
+    def seek(self, frame):
+        self._pos = max(0, min(frame, self.frames))
+
+    def tell(self):
+        return self._pos
+
+    def segment(self, start_frame=0, end_frame=None):
+        ''' Return a new buffer with its own cursor over a range of frames.
+            Shares the data, handy for overlapping playback.
+        '''
+        size = self._frame_size
+        return PCMBuffer(self.data[start_frame * size:
+                                   None if end_frame is None else
+                                   end_frame * size], self.format)
+
+    def close(self):
+        self.data = memoryview(b'')
+        self.frames = self._pos = 0
+
+
+class WavReader(PCMBuffer):
+    ''' A memory-mapped reader of PCM WAV files, for use on audio threads.
+
+        Arguments:
+
+            path            Path to a .wav file.
+
+        The RIFF header is parsed once and the data chunk is mapped,
+        read() then returns memoryview slices into it, no syscalls or copies.
+    '''
+    def __init__(self, path):
+        import mmap  # deferred
+        from struct import unpack_from
+
+        with open(path, 'rb') as infile:
+            self._map = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            offset, size, fmt = self._parse(self._map, unpack_from)
+        except Exception:
+            self._map.close()
+            raise
+        super().__init__(memoryview(self._map)[offset:offset + size], fmt)
+        self.path = path
+
+    def __repr__(self):
+        return '%s(%r, %s)' % (self.__class__.__name__, self.path,
+                               self.format)
+
+    @staticmethod
+    def _parse(buf, unpack_from):
+        ''' Walk the RIFF chunks, return data offset, size, and format. '''
+        from wave import Error  # deferred, for compatibility
+
+        if buf[:4] != b'RIFF' or buf[8:12] != b'WAVE':
+            raise Error('file does not start with RIFF/WAVE id')
+        fmt = None
+        pos, end = 12, len(buf)
+        while pos + 8 <= end:
+            chunk_id, size = unpack_from('<4sI', buf, pos)
+            pos += 8
+            if chunk_id == b'fmt ':
+                tag, channels, rate, _, _, bits = unpack_from('<HHIIHH',
+                                                             buf, pos)
+                if tag == 0xFFFE and size >= 40:  # extensible, get subformat
+                    tag = unpack_from('<H', buf, pos + 24)[0]
+                if tag != 1:
+                    raise Error('unknown format: %r' % tag)
+                fmt = AudioFormat(rate, channels, (bits + 7) // 8)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise Error('data chunk before fmt chunk')
+                return pos, min(size, end - pos), fmt  # streamed sizes lie
+            pos += size + (size & 1)  # chunks are word-aligned
+        raise Error('fmt or data chunk missing')
+
+    def close(self):
+        ''' Unmap the file, if slices handed out are no longer in use. '''
+        data = self.data
+        super().close()
+        data.release()
+        try:
+            self._map.close()
+        except BufferError:  # exported slice still alive, leave it to gc
+            log.debug('mapping still in use: %r', self.path)
+
+
+def to_wav(buffer, format=None):
+    ''' Return the audio of a PCMBuffer as the bytes of a WAV file,
+        e.g. for winsound's SND_MEMORY.  Or raw bytes, given their format.
+    '''
+    import io  # deferred
+    import wave
+
+    if format is not None:
+        buffer = PCMBuffer(buffer, format)
+    outfile = io.BytesIO()
+    fmt = buffer.format
+    with wave.open(outfile, 'wb') as writer:
+        writer.setnchannels(fmt.channels)
+        writer.setsampwidth(fmt.sample_width)
+        writer.setframerate(fmt.sample_rate)
+        writer.writeframes(buffer.data)
+    return outfile.getvalue()
+
+
+class SoundBank:
+    ''' A registry of short WAV sounds by name, loaded once and kept in
+        memory as PCM, for playing the same clips over and over.
+
+        Arguments:
+
+            source          A directory of .wav files, a .json manifest
+                            of name: path, a mapping of the same,
+                            or an iterable of paths.  Names default to
+                            the file name, sans extension.
+            max_bytes       Budget for the audio kept in memory,
+                            least recently used is evicted first and
+                            reloaded when next needed.
+            preload         Load everything now, up to the budget.
+
+        Each get() validates its file with a single os.stat(),
+        and reloads it if the modification time or size has changed.
+        play() hands the buffer to a player that takes in-memory audio,
+        WinBoomBox, PyAudioBoomBox, or GstBoomBox.
+    '''
+    def __init__(self, source=None, max_bytes=33_554_432, preload=True):
+        self._paths = {}  # name: path
+        self._stamps = {}  # name: (mtime, size) when loaded
+        self._cache = BufferCache(max_bytes)
+        if source is not None:
+            self.add_all(source)
+        if preload:
+            for name in self._paths:
+                if self._cache.nbytes >= max_bytes:
+                    break
+                self.get(name)
+
+    def __contains__(self, name):
+        return name in self._paths
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __repr__(self):
+        return '%s(%s sounds, %s)' % (self.__class__.__name__,
+                                      len(self._paths), self._cache)
+
+    def add(self, name, path):
+        ''' Register a sound file under name, loaded on first get(). '''
+        self._paths[name] = abspath(path)
+        self._stamps.pop(name, None)
+
+    def add_all(self, source):
+        ''' Register a directory, manifest file, mapping, or iterable of
+            paths.  See class docs.
+        '''
+        if isinstance(source, (str, os.PathLike)):
+            source = os.fspath(source)
+            if os.path.isdir(source):
+                source = sorted(
+                    join(source, entry) for entry in os.listdir(source)
+                    if entry.lower().endswith('.wav')
+                )
+            else:  # a manifest
+                import json  # deferred
+
+                with open(source) as infile:
+                    manifest = json.load(infile)
+                folder = os.path.dirname(abspath(source))
+                source = {name: join(folder, path)  # relative to manifest
+                          for name, path in manifest.items()}
+
+        if hasattr(source, 'items'):
+            for name, path in source.items():
+                self.add(name, path)
+        else:
+            for path in source:
+                name = os.path.splitext(os.path.basename(path))[0]
+                self.add(name, path)
+
+    def names(self):
+        return tuple(self._paths)
+
+    def get(self, name):
+        ''' Return the sound as a PCMBuffer, loading it if needed.
+            Players should take a segment() of it, for their own cursor.
+        '''
+        path = self._paths[name]
+        stat = os.stat(path)  # the one syscall when cached
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        buffer = self._cache.get(name)
+        if buffer is None or self._stamps.get(name) != stamp:
+            if buffer is not None:
+                log.debug('changed on disk, reloading: %r', path)
+            buffer = self._load(name, path, stamp)
+        return buffer
+
+    def _load(self, name, path, stamp):
+        reader = WavReader(path)
+        try:  # copy out, so the file may change or go away
+            buffer = PCMBuffer(reader.data.tobytes(), reader.format)
+        finally:
+            reader.close()
+        self._stamps[name] = stamp
+        log.debug('loaded: %r, %s', name, buffer)
+        return self._cache.put(name, buffer)
+
+    def play(self, name, wait=None, player=None, **kwargs):
+        ''' Play a sound from memory, return the player.
+
+            Arguments:
+
+                name            Name of the sound.
+                wait            Wait to finish.
+                player          A player class, the default BoomBox if None.
+
+            Other keyword arguments are passed to the player.
+        '''
+        player = player or _selected or select_backend()
+        if not player.in_memory:
+            raise TypeError('%s does not play from memory.' % player.__name__)
+        return player(self.get(name), wait=wait, **kwargs).play()
+
+    def discard(self, name):
+        ''' Remove a sound from the bank. '''
+        del self._paths[name]
+        self._stamps.pop(name, None)
+        self._cache.discard(name)
+
+    def clear(self):
+        ''' Unload the audio, names are kept and reloaded on demand. '''
+        self._cache.clear()
+        self._stamps.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class _RingBuffer:
+    ''' A bounded byte FIFO, written by a producer that waits while it is
+        full, and read by an audio thread that need not wait.
+    '''
+    def __init__(self, capacity):
+        from threading import Condition  # deferred
+
+        self.capacity = capacity
+        self.finished = False  # no more input
+        self.cancelled = False  # reader gone
+        self._buf = bytearray(capacity)
+        self._head = self._size = 0
+        self._cond = Condition()
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data):
+        ''' Copy data in, waiting for room.  False if cancelled meanwhile. '''
+        data = memoryview(data).cast('B')
+        buf, capacity = self._buf, self.capacity
+        with self._cond:
+            while len(data):
+                while self._size == capacity and not self.cancelled:
+                    self._cond.wait()
+                if self.cancelled:
+                    return False
+                tail = (self._head + self._size) % capacity
+                count = min(len(data), capacity - self._size, capacity - tail)
+                buf[tail:tail + count] = data[:count]
+                data = data[count:]
+                self._size += count
+                self._cond.notify_all()
+        return True
+
+    def read(self, nbytes, align=1, timeout=0):
+        ''' Take up to nbytes, in whole multiples of align.
+
+            Waits up to timeout seconds for some, None waits for data or
+            the end.  The default returns what there is at once.
+        '''
+        with self._cond:
+            if timeout != 0:
+                self._cond.wait_for(lambda: self._size >= align or
+                                    self.finished or self.cancelled, timeout)
+            count = min(nbytes, self._size)
+            count -= count % align
+            head, capacity = self._head, self.capacity
+            first = min(count, capacity - head)  # up to the wrap
+            data = bytes(self._buf[head:head + first])
+            if count > first:
+                data += self._buf[:count - first]
+            self._head = (head + count) % capacity
+            self._size -= count
+            self._cond.notify_all()
+        return data
+
+    def finish(self):
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+
+    def cancel(self):
+        with self._cond:
+            self.cancelled = True
+            self._cond.notify_all()
+
+
+class PCMStream:
+    ''' Live PCM audio from a producer, for players that accept a stream.
+
+        Arguments:
+
+            source          An iterable or async iterable of bytes-like
+                            chunks, or a binary file-like object.
+            format          An AudioFormat describing them.
+            buffer_ms       Size of the ring buffer between the producer
+                            and the audio thread.  The producer waits while
+                            it is full, so memory use stays constant.
+
+        Plays once, from the first chunk on.  Underruns are filled with
+        silence and counted, the end is when the source is exhausted and
+        the buffer drained.  Async iterables are run on the event loop
+        that starts playback, if any, else on a thread of their own.
+    '''
+    frames = 0  # length unknown, can't rewind
+
+    def __init__(self, source, format, buffer_ms=500):
+        frame_size = format.frame_size
+        self.source = source
+        self.format = format
+        self.error = None
+        self.underruns = 0
+        self._frame_size = frame_size
+        self._ring = _RingBuffer(frame_size * max(
+            1, int(format.sample_rate * buffer_ms / 1000)))
+        self._silence = b'\x80' if format.sample_width == 1 else b'\0'
+        self._pos = 0
+        self._task = None
+
+    def __repr__(self):
+        return '%s(%r, %s)' % (self.__class__.__name__, self.source,
+                               self.format)
+
+    def start(self):
+        ''' Begin pulling from the source, once. '''
+        if self._task is not None:
+            return
+        from threading import Thread  # deferred
+
+        source = self.source
+        if hasattr(source, '__aiter__'):
+            import asyncio  # deferred
+
+            try:
+                self._task = asyncio.get_running_loop().create_task(
+                    self._pump_async())
+                return
+            except RuntimeError:  # no loop running here
+                target = lambda: asyncio.run(self._pump_async())
+        else:
+            target = self._pump
+        self._task = Thread(target=target, daemon=True,
+                            name='boombox-stream')
+        self._task.start()
+
+    def _chunks(self):
+        source = self.source
+        if hasattr(source, 'read'):  # file-like
+            size = self._ring.capacity // 4
+            return iter(lambda: source.read(size), b'')
+        return iter(source)
+
+    def _pump(self):
+        try:
+            for chunk in self._chunks():
+                if not self._ring.write(chunk):
+                    break  # closed
+        except Exception as err:
+            log.error('stream source failed: %r', err)
+            self.error = err
+        finally:
+            self._ring.finish()
+
+    async def _pump_async(self):
+        import asyncio  # deferred
+
+        loop = asyncio.get_running_loop()
+        try:
+            async for chunk in self.source:  # waits in a thread when full
+                if not await loop.run_in_executor(None, self._ring.write,
+                                                  chunk):
+                    break
+        except Exception as err:
+            log.error('stream source failed: %r', err)
+            self.error = err
+        finally:
+            self._ring.finish()
+
+    def read(self, frame_count):
+        ''' Return frame_count frames without waiting, padded with silence
+            on underrun.  Fewer means the end.
+        '''
+        self.start()
+        ring, frame_size = self._ring, self._frame_size
+        nbytes = frame_count * frame_size
+        data = ring.read(nbytes, frame_size)
+        if len(data) < nbytes and not (ring.finished and
+                                       len(ring) < frame_size):
+            self.underruns += 1
+            data += self._silence * (nbytes - len(data))
+        self._pos += len(data) // frame_size
+        return data
+
+    def pull(self, nbytes):
+        ''' Return up to nbytes of whole frames, waiting for some.
+            Empty at the end.
+        '''
+        self.start()
+        data = self._ring.read(nbytes, self._frame_size, timeout=None)
+        self._pos += len(data) // self._frame_size
+        return data
+
+    def rewind(self):
+        pass  # live, plays once
+
+    def tell(self):
+        return self._pos
+
+    def segment(self, start_frame=0, end_frame=None):
+        return self  # only the one cursor
+
+    def close(self):
+        ''' Stop the producer, and drop what is buffered. '''
+        self._ring.cancel()
+
+
+def _as_stream(sound_file, format):
+    ''' Wrap a producer of PCM chunks, given with its format, in a
+        PCMStream.  Paths and buffers pass through.
+    '''
+    if isinstance(sound_file, (str, os.PathLike, PCMBuffer, PCMStream)):
+        return sound_file
+    if format is None:
+        raise TypeError('a format is required to stream %r' % sound_file)
+    return PCMStream(sound_file, format)
+
+
+
+# ---- Conversion ------------------------------------------------------------
+@lru_cache(maxsize=None)
+def _audioop():
+    ''' Return the audioop module if available, else None.  Checked once. '''
+    import warnings  # deferred
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            import audioop  # removed in Python 3.13
+    except ImportError:
+        audioop = None
+    return audioop
+
+
+def _np_decode(np, data, width, channels):
+    ''' Decode PCM bytes into a float32 array of frames × channels, ±1. '''
+    if width == 1:
+        samples = np.frombuffer(data, np.uint8).astype(np.float32) - 128
+        samples /= 128
+    elif width == 3:  # assemble little-endian 24-bit
+        raw = np.frombuffer(data, np.uint8).reshape(-1, 3).astype(np.int32)
+        ints = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        ints[ints >= 0x800000] -= 0x1000000
+        samples = ints.astype(np.float32) / 0x800000
+    else:
+        dtype, scale = ('<i2', 0x8000) if width == 2 else ('<i4', 0x80000000)
+        samples = np.frombuffer(data, dtype).astype(np.float32) / scale
+    return samples.reshape(-1, channels)
+
+
+def _np_encode(np, samples, width):
+    ''' Encode a float array, ±1, to little-endian PCM bytes. '''
+    samples = np.clip(samples, -1, 1).ravel()
+    if width == 1:
+        return (samples * 0x7F + 0x80).astype(np.uint8).tobytes()
+    if width == 2:
+        return (samples * 0x7FFF).astype('<i2').tobytes()
+    if width == 3:
+        ints = (samples * 0x7FFFFF).astype('<i4')
+        return ints.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return (samples.astype(np.float64) * 0x7FFFFFFF).astype('<i4').tobytes()
+
+
+class PCMConverter:
+    ''' Convert a stream of PCM chunks from one AudioFormat to another.
+
+        Arguments:
+
+            source          AudioFormat of incoming chunks.
+            target          AudioFormat to produce.
+
+        Sample width, channel count (up/down mix), and rate (linear
+        interpolation) are converted; resampler state is carried across
+        chunks.  Uses NumPy when installed, otherwise the audioop module,
+        which handles mono and stereo only.
+    '''
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+        self._np = np = _numpy()
+        self._audioop = None if np else _audioop()
+        if not (np or self._audioop):
+            raise ImportError('PCM conversion requires NumPy, try: '
+                              'pip install --user numpy.')
+        if not np and (max(source.channels, target.channels) > 2):
+            raise ValueError('more than two channels requires NumPy.')
+        self._state = None
+
+    def convert(self, data):
+        ''' Convert a chunk of whole frames, returns bytes. '''
+        if self._np:
+            return self._convert_np(data)
+        return self._convert_audioop(data)
+
+    def _convert_np(self, data):
+        np, src, dst = self._np, self.source, self.target
+        frames = _np_decode(np, data, src.sample_width, src.channels)
+
+        if src.channels != dst.channels:
+            if dst.channels == 1:
+                frames = frames.mean(axis=1, keepdims=True)
+            elif src.channels == 1:
+                frames = np.repeat(frames, dst.channels, axis=1)
+            else:  # keep what fits, pad with silence
+                fitted = np.zeros((len(frames), dst.channels), np.float32)
+                common = min(src.channels, dst.channels)
+                fitted[:, :common] = frames[:, :common]
+                frames = fitted
+
+        if src.sample_rate != dst.sample_rate:
+            frames = self._resample_np(frames)
+        return _np_encode(np, frames, dst.sample_width)
+
+    def _resample_np(self, frames):
+        ''' Linear interpolation, continuing from the previous chunk. '''
+        np = self._np
+        step = self.source.sample_rate / self.target.sample_rate
+        if self._state is None:
+            prev, pos = frames[:0], 0.0
+        else:
+            prev, pos = self._state
+        frames = np.concatenate((prev, frames))
+        last = len(frames) - 1
+        count = int(np.ceil((last - pos) / step)) if last > pos else 0
+
+        where = pos + np.arange(count) * step
+        index = where.astype(np.intp)
+        frac = (where - index).astype(np.float32)[:, None]
+        out = frames[index] * (1 - frac) + frames[index + 1] * frac
+        self._state = (frames[last:], pos + count * step - last)
+        return out
+
+    def _convert_audioop(self, data):
+        audioop, src, dst = self._audioop, self.source, self.target
+        width = src.sample_width
+        if width == 1:
+            data = audioop.bias(data, 1, -0x80)  # to signed
+        if width != dst.sample_width:
+            data = audioop.lin2lin(data, width, dst.sample_width)
+            width = dst.sample_width
+
+        if src.channels == 1 and dst.channels == 2:
+            data = audioop.tostereo(data, width, 1, 1)
+        elif src.channels == 2 and dst.channels == 1:
+            data = audioop.tomono(data, width, .5, .5)
+
+        if src.sample_rate != dst.sample_rate:
+            data, self._state = audioop.ratecv(
+                data, width, dst.channels, src.sample_rate, dst.sample_rate,
+                self._state,
+            )
+        if width == 1:
+            data = audioop.bias(data, 1, 0x80)  # back to unsigned
+        return data
+
+
+def convert_pcm(data, source, target):
+    ''' Convert a whole buffer of PCM bytes from one AudioFormat to another.
+    '''
+    if source == target:
+        return data
+    return PCMConverter(source, target).convert(data)
+
+
+class ConversionCache:
+    ''' WAV files converted once to a target format, e.g. the output
+        device's, and kept in memory, optionally on disk as well.
+
+        Arguments:
+
+            max_bytes       Memory budget, least recently used go first.
+            directory       Where converted files are kept across runs,
+                            True for ~/.cache/boombox, None for memory only.
+
+        In memory, sounds are looked up by path, modification time, size
+        and target format, one stat per get().  On disk, by content hash,
+        modification time and target format.  Conversion is vectorized
+        with NumPy when installed, see PCMConverter.
+    '''
+    def __init__(self, max_bytes=67_108_864, directory=None):
+        if directory is True:
+            directory = join(os.environ.get('XDG_CACHE_HOME')
+                             or os.path.expanduser('~/.cache'), 'boombox')
+        self.directory = directory
+        self.conversions = self.disk_hits = 0
+        self._cache = BufferCache(max_bytes)
+
+    def __repr__(self):
+        return '%s(%r, %s)' % (self.__class__.__name__, self.directory,
+                               self.stats())
+
+    def get(self, path, target):
+        ''' Return the sound at path as a PCMBuffer in target format. '''
+        info = os.stat(path)
+        key = (path, info.st_mtime_ns, info.st_size, target)
+        data = self._cache.fetch(
+            key, lambda: self._load(path, info.st_mtime_ns, target))
+        return PCMBuffer(data, target)
+
+    def _load(self, path, mtime_ns, target):
+        source = WavReader(path)
+        try:
+            if source.format == target:  # nothing to convert, or store
+                return source.data.tobytes()
+            cached = None
+            if self.directory:
+                import hashlib  # deferred
+
+                digest = hashlib.blake2b(source._map, digest_size=16)
+                cached = join(self.directory, '%s-%s-%s-%s-%s.wav' % (
+                    digest.hexdigest(), mtime_ns, *target))
+                if os.path.exists(cached):
+                    self.disk_hits += 1
+                    reader = WavReader(cached)
+                    data = reader.data.tobytes()
+                    reader.close()
+                    return data
+
+            log.debug('converting %r to: %s', path, target)
+            data = convert_pcm(source.data, source.format, target)
+            self.conversions += 1
+        finally:
+            source.close()
+        if cached:
+            self._store(cached, data, target)
+        return data
+
+    def _store(self, cached, data, target):
+        ''' Write a converted file, whole or not at all. '''
+        import tempfile  # deferred
+
+        temp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix='.tmp',
+                                             dir=self.directory)
+            with os.fdopen(fd, 'wb') as outfile:
+                outfile.write(to_wav(data, target))
+            os.replace(temp_path, cached)
+        except OSError as err:
+            log.warning('not cached on disk: %r', err)
+            if temp_path:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass  # gone already
+
+    def clear(self):
+        ''' Empty the memory cache, files on disk are kept. '''
+        self._cache.clear()
+
+    def stats(self):
+        return dict(self._cache.stats(), conversions=self.conversions,
+                    disk_hits=self.disk_hits)
+
+
+conversion_cache = ConversionCache()  # for players with native=True
+
+
+# ---- Effects ---------------------------------------------------------------
+class Effects:
+    ''' Gain, pan and fades, applied to each buffer as a sound plays.
+
+        Arguments:
+
+            gain            Linear, 1.0 as is.  A change ramps over one
+                            buffer, so it doesn't click.
+            pan             -1.0 left, 0 centre, 1.0 right.  Stereo only,
+                            the other side is attenuated.
+            fade_in_ms      Fade in from the start of each play.
+            fade_out_ms     Fade out to the end, where the length is
+                            known, i.e. not live streams.
+
+        Give one to PyAudioBoomBox or GstBoomBox as effects=, then set
+        any of them while the sound plays; the next buffer picks it up.
+        The sound itself is left alone, so one cached buffer serves every
+        variant.  Tones and sequences are not affected.
+    '''
+    __slots__ = ('gain', 'pan', 'fade_in_ms', 'fade_out_ms', '_players')
+
+    def __init__(self, gain=1.0, pan=0.0, fade_in_ms=0, fade_out_ms=0):
+        import weakref  # deferred
+
+        object.__setattr__(self, '_players', weakref.WeakSet())
+        self.gain = gain
+        self.pan = pan
+        self.fade_in_ms = fade_in_ms
+        self.fade_out_ms = fade_out_ms
+
+    def __repr__(self):
+        return '%s(gain=%s, pan=%s, fade_in_ms=%s, fade_out_ms=%s)' % (
+            self.__class__.__name__, self.gain, self.pan, self.fade_in_ms,
+            self.fade_out_ms)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        for player in tuple(self._players):  # gstreamer elements to update
+            player._effects_changed()
+
+
+class _Processed:
+    ''' A source read through Effects, for one play.
+
+        Samples go through preallocated NumPy arrays, grown only when a
+        bigger buffer is asked for.  16-bit audio is processed in place,
+        then copied out as bytes for the caller to keep, other widths
+        convert through float copies.  Without
+        NumPy, audioop applies a per-buffer gain, stepped not ramped.
+    '''
+    def __init__(self, source, effects):
+        self.source = source
+        self.effects = effects
+        self.format = fmt = source.format
+        self._np = np = _numpy()
+        self._audioop = None if np else _audioop()
+        if not (np or self._audioop):
+            raise ImportError('Effects require NumPy, try: '
+                              'pip install --user numpy.')
+        self._frame_size = fmt.frame_size
+        self._rate = fmt.sample_rate / 1000
+        self._stereo = fmt.channels == 2
+        self._gain = None  # last applied, ramped from
+        self._size = 0  # of the arrays below
+        self._index = self._env = self._fade = self._work = self._out = None
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__, self.source,
+                               self.effects)
+
+    @property
+    def frames(self):
+        return self.source.frames
+
+    def rewind(self):
+        self.source.rewind()
+
+    def tell(self):
+        return self.source.tell()
+
+    def read(self, frame_count):
+        ''' Read from the source, then process, or pass it on as is. '''
+        source, effects = self.source, self.effects
+        start = source.tell()
+        data = source.read(frame_count)
+        count = len(data) // self._frame_size
+        gain = effects.gain
+        last = gain if self._gain is None else self._gain
+        self._gain = gain
+        pan = effects.pan if self._stereo else 0
+        fade_in = int(effects.fade_in_ms * self._rate)
+        total = source.frames
+        fade_out = int(effects.fade_out_ms * self._rate) if total else 0
+        if not count or (
+            gain == last == 1 and not pan and start >= fade_in and
+            not (fade_out and start + count > total - fade_out)
+        ):
+            return data  # the usual, untouched view
+        if self._np:
+            return self._process_np(data, count, start, last, gain, pan,
+                                    fade_in, fade_out)
+        return self._process_audioop(data, count, start, last, gain, pan,
+                                     fade_in, fade_out)
+
+    def _arrays(self, count):
+        ''' Size the work arrays for count frames, reusing them after. '''
+        if count > self._size:
+            np, channels = self._np, self.format.channels
+            self._size = count
+            self._index = np.arange(count, dtype=np.float32)
+            self._env = np.empty(count, np.float32)
+            self._fade = np.empty(count, np.float32)
+            self._work = np.empty((count, channels), np.float32)
+            self._out = np.empty((count, channels), '<i2')
+        return self._index[:count], self._env[:count], self._fade[:count]
+
+    def _process_np(self, data, count, start, last, gain, pan, fade_in,
+                    fade_out):
+        np, fmt = self._np, self.format
+        index, env, fade = self._arrays(count)
+        np.multiply(index, (gain - last) / count, out=env)  # the ramp
+        env += last
+        if start < fade_in:
+            np.add(index, start, out=fade)
+            fade *= 1 / fade_in
+            np.minimum(fade, 1, out=fade)
+            env *= fade
+        if fade_out:  # frames left, over the fade length
+            np.subtract(self.source.frames - start, index, out=fade)
+            fade *= 1 / fade_out
+            np.clip(fade, 0, 1, out=fade)
+            env *= fade
+
+        if fmt.sample_width == 2:
+            work = self._work[:count]
+            np.copyto(work, np.frombuffer(data, '<i2', count * fmt.channels)
+                      .reshape(count, fmt.channels))
+        else:
+            work = _np_decode(np, data, fmt.sample_width, fmt.channels)
+        for channel in range(fmt.channels):  # broadcasting would copy
+            column = work[:, channel]
+            column *= env
+        if pan:
+            work[:, 0] *= 1 - max(pan, 0)
+            work[:, 1] *= 1 + min(pan, 0)
+
+        if fmt.sample_width != 2:
+            return _np_encode(np, work, fmt.sample_width)
+        np.clip(work, -0x8000, 0x7FFF, out=work)
+        out = self._out[:count]
+        np.copyto(out, work, casting='unsafe')
+        return out.tobytes()  # the arrays are reused next read
+
+    def _process_audioop(self, data, count, start, last, gain, pan,
+                         fade_in, fade_out):
+        audioop, width = self._audioop, self.format.sample_width
+        middle = start + count / 2
+        gain = (last + gain) / 2
+        if fade_in:
+            gain *= min(1, middle / fade_in)
+        if fade_out:
+            gain *= max(0, min(1, (self.source.frames - middle) / fade_out))
+        data = bytes(data)
+        if width == 1:
+            data = audioop.bias(data, 1, -0x80)  # to signed
+        if pan:
+            left = audioop.tomono(data, width, 1, 0)
+            right = audioop.tomono(data, width, 0, 1)
+            data = audioop.add(
+                audioop.tostereo(left, width, gain * (1 - max(pan, 0)), 0),
+                audioop.tostereo(right, width, 0, gain * (1 + min(pan, 0))),
+                width)
+        else:
+            data = audioop.mul(data, width, gain)
+        if width == 1:
+            data = audioop.bias(data, 1, 0x80)  # back to unsigned
+        return data
+
+
+
+# ---- Instrumentation -------------------------------------------------------
+class PlayerStats:
+    ''' Timings in milliseconds and counters of one player, kept when
+        instrument() is on.  Timings are the latest, counters the total.
+
+            init_ms             Construction of the player.
+            verify_ms           verify_file(), the checks of the file.
+            open_ms             Opening the stream or building the pipeline.
+            first_buffer_ms     From play() to the first buffer handed to
+                                the device, or reaching the sink.
+            spawn_ms            Starting a command-line player.
+            plays, underruns, overruns
+    '''
+    __slots__ = ('init_ms', 'verify_ms', 'open_ms', 'first_buffer_ms',
+                 'spawn_ms', 'plays', 'underruns', 'overruns')
+
+    def __init__(self):
+        self.init_ms = self.verify_ms = self.open_ms = None
+        self.first_buffer_ms = self.spawn_ms = None
+        self.plays = self.underruns = self.overruns = 0
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__, ', '.join(
+            '%s=%s' % pair for pair in self.as_dict().items()
+            if pair[1] is not None))
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+_instrumented = False
+_stats_hook = None
+
+
+def instrument(enabled=True, hook=None):
+    ''' Turn instrumentation on or off, for players created from now on.
+
+        Arguments:
+
+            enabled         Keep a PlayerStats on each new player,
+                            as its stats attribute, else None.
+            hook            Optional callable, hook(player, name, value),
+                            called with each measurement as it is made,
+                            e.g. to forward to a metrics system.
+                            May be called on audio or GLib threads,
+                            so keep it quick.
+    '''
+    global _instrumented, _stats_hook
+
+    _instrumented = enabled
+    _stats_hook = hook if enabled else None
+
+
+# ---- Handles ----------------------------------------------------------------
+class _HandleTable:
+    ''' Players holding an open file, stream or pipeline, least recently
+        played first.  Those over max_open, or idle for max_idle seconds,
+        are closed unless playing, and reopen on their next play.
+
+        Arguments:
+
+            max_open        Most players holding handles at once,
+                            None for no limit.
+            max_idle        Seconds a player keeps its handles after
+                            playing, None for as long as it lives.
+    '''
+    def __init__(self, max_open=64, max_idle=30):
+        from collections import OrderedDict  # deferred
+        from threading import RLock
+
+        self.max_open = max_open
+        self.max_idle = max_idle
+        self.reclaimed = 0
+        self._players = OrderedDict()  # id: (weakref, last played)
+        self._lock = RLock()  # held while closing, which calls discard
+        self._timer = None
+
+    def __len__(self):
+        return len(self._players)
+
+    def touch(self, player):
+        ''' Note a player is about to play, making room for it if new. '''
+        import weakref  # deferred
+
+        key = id(player)
+        with self._lock:
+            entry = self._players.get(key)
+            if entry and entry[0]() is player:
+                self._players.move_to_end(key)
+                ref = entry[0]
+            else:
+                if self.max_open is not None:
+                    self._reclaim(len(self._players) + 1 - self.max_open)
+                ref = weakref.ref(player, lambda ref: self._forget(key, ref))
+            self._players[key] = (ref, monotonic())
+            if self._timer is None:
+                self._schedule()
+
+    def discard(self, player):
+        ''' Forget a player, it has closed. '''
+        with self._lock:
+            entry = self._players.get(id(player))
+            if entry and entry[0]() in (player, None):
+                del self._players[id(player)]
+
+    def clear(self):
+        ''' Close all idle players now, releasing their handles. '''
+        with self._lock:
+            self._reclaim(len(self._players))
+
+    def _forget(self, key, ref):  # player collected
+        with self._lock:
+            if self._players.get(key, (None,))[0] is ref:
+                del self._players[key]
+
+    def _schedule(self):  # lock held
+        from threading import Timer  # deferred
+
+        if self.max_idle is None:
+            return
+        self._timer = Timer(self.max_idle / 2, self._sweep)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _sweep(self):  # on the timer thread
+        with self._lock:
+            self._timer = None
+            if self.max_idle is not None:
+                self._reclaim(0, monotonic() - self.max_idle)
+            if self._players:
+                self._schedule()
+
+    def _reclaim(self, excess, expired=None):  # lock held
+        ''' Close the oldest players not playing: excess of them, and any
+            last played before expired.
+        '''
+        for key, (ref, played) in list(self._players.items()):
+            if excess <= 0 and (expired is None or played >= expired):
+                break  # the rest are newer
+            player = ref()
+            if player is None or player._busy():
+                continue
+            log.debug('reclaiming handles of: %r', player)
+            player.close()  # and discard()
+            self._players.pop(key, None)
+            self.reclaimed += 1
+            excess -= 1
+
+
+_handles = _HandleTable()
+
+
+_LATENCIES = {'low': 10, 'default': None, 'power-save': 250}  # ms
+
+
+def _latency_ms(latency):
+    ''' Resolve a latency option to a target in ms, None for the default. '''
+    if latency is None or isinstance(latency, (int, float)):
+        return latency
+    try:
+        return _LATENCIES[latency]
+    except KeyError:
+        raise ValueError('latency must be ms or one of: %s, not %r'
+                         % (', '.join(_LATENCIES), latency)) from None
+
+
+def _resolve(future, error=None):
+    ''' Finish an asyncio future, unless cancelled already. '''
+    if not future.done():
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+
 class _BoomBoxBase:
-    ''' Base class for proxy control of an audio player. '''
+    ''' Base class for proxy control of an audio player.
+
+        Players are kept small, with __slots__, and those that open a
+        file, stream or pipeline do so on first play.  They let go of it
+        when idle or over the limit, see BoomBox.handles.
+    '''
+    __slots__ = ('_latency', '_ended', '_waiters', '_waiters_lock', 'stats',
+                 '_created', '_play_time', '__weakref__')
+    in_memory = False  # takes a PCMBuffer as sound_file, see SoundBank
+    cues = None  # name: (start_ms, end_ms), where segments are supported
+    handles = _handles  # players holding handles, shared
+
+    def __init__(self, latency=None):
+        from threading import Event, Lock  # deferred
+
+        self._latency = _latency_ms(latency)  # target in ms, or None
+        self._ended = Event()  # for blocking waits
+        self._ended.set()  # not playing
+        self._waiters = []  # (loop, future) pairs for asyncio
+        self._waiters_lock = Lock()
+        self.stats = PlayerStats() if _instrumented else None
+        self._created = perf_counter()
+        self._play_time = None  # when play() began, if instrumented
+
+    def play_tone(self, **kwargs):
+        ''' Generate a tone for beep or ring-like purposes. '''
+        msg = 'play_tone() not implemented, is PyAudio installed?'
+        raise NotImplementedError(msg)
+
+    def play_sequence(self, notes, **kwargs):
+        ''' Play a sequence of tones, see render_sequence. '''
+        msg = 'play_sequence() not implemented, is PyAudio installed?'
+        raise NotImplementedError(msg)
+
+    @property
+    def latency_ms(self):
+        ''' Output latency in ms as reported by the backend, None if it
+            doesn't say, or isn't set up yet.
+        '''
+        return None
+
+    def play(self):
+        raise NotImplementedError('play() not yet implemented.')
+        return self  # convenience
+
+    def stop(self):
+        raise NotImplementedError('stop() not yet implemented.')
+
+    def _start(self):
+        ''' Begin playback and return at once. '''
+        raise NotImplementedError('_start() not yet implemented.')
+
+    async def play_async(self, cue=None, start_ms=None, end_ms=None):
+        ''' Play, then return when finished, without blocking the loop. '''
+        span = self._span(cue, start_ms, end_ms)
+        done = self.completion()
+        self._start(*((span,) if span else ()))  # segments, where supported
+        await done
+        return self  # convenience
+
+    def _span(self, cue, start_ms, end_ms):
+        ''' Resolve play() arguments to a (start_ms, end_ms) span,
+            or None for the whole sound.
+        '''
+        if cue is not None:
+            try:
+                start_ms, end_ms = self.cues[cue]
+            except (KeyError, TypeError):
+                raise KeyError('unknown cue: %r' % cue) from None
+        if start_ms is None and end_ms is None:
+            return None
+        return (start_ms or 0, end_ms)
+
+    def completion(self):
+        ''' Return an asyncio future, resolved when the sound next ends,
+            or on stop().  Call it from a coroutine, on the running loop.
+        '''
+        import asyncio  # deferred
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._waiters_lock:
+            self._waiters.append((loop, future))
+        return future
+
+    def _busy(self):
+        ''' Playing, or holding a live stream that can't be reopened. '''
+        return (not self._ended.is_set()
+                or isinstance(getattr(self, '_sound_file', None), PCMStream))
+
+    def _playback_started(self):
+        self._ended.clear()
+        if self.stats is not None:
+            self.stats.plays += 1
+            self._play_time = perf_counter()
+
+    def _record(self, name, value):
+        ''' Store a measurement on stats, and pass it to the hook. '''
+        setattr(self.stats, name, value)
+        if _stats_hook:
+            try:
+                _stats_hook(self, name, value)
+            except Exception as err:  # maybe on an audio thread, don't die
+                log.error('stats hook failed: %r', err)
+
+    def _count(self, name):
+        self._record(name, getattr(self.stats, name) + 1)
+
+    def _timed(self, name, func, *args):
+        ''' Call func, recording how long it took if instrumented. '''
+        if self.stats is None:
+            return func(*args)
+        start = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._record(name, (perf_counter() - start) * 1000)
+
+    def _initialized(self):
+        if self.stats is not None:
+            self._record('init_ms', (perf_counter() - self._created) * 1000)
+
+    def _first_buffer(self):
+        ''' Record time since play(), once per play.  Audio thread safe. '''
+        started, self._play_time = self._play_time, None
+        if started is not None:
+            self._record('first_buffer_ms', (perf_counter() - started) * 1000)
+
+    def _playback_done(self, error=None):
+        ''' Signal waiters that playback ended, safe from any thread. '''
+        with self._waiters_lock:
+            waiters, self._waiters = self._waiters, []
+        self._ended.set()
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve, future, error)
+
+    @staticmethod
+    def verify_file(path):
+        ''' Check file is accessible, early on.  Prone to race conditions. '''
+        path = abspath(path)
+        try:
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            raise FileNotFoundError(repr(path)) from None
+        if not os.access(path, os.R_OK):
+            raise PermissionError(repr(path))
+        if not size:
+            raise EOFError(repr(path))
+        if os.name == 'nt':
+            path = path.replace('\\', '/')  # :-/
+        log.debug('verified: %r', path)
+        return path
+
+
+class WinBoomBox(_BoomBoxBase):
+    ''' Play an audio file via the winsound module.
+
+        Arguments:
+
+            sound_file      May be a path, an alias, bytes-like object of
+                            WAV data, or a PCMBuffer.
+            wait            Wait to finish, or play in background & return now.
+            is_alias        Use to inform winsound that sound_file is an alias.
+
+        Notes:
+            - https://docs.python.org/3/library/winsound.html
+            - Only WAV format files are supported.
+            - winsound has no end notification, and can't play from
+              memory asynchronously, so in the background a thread
+              waits on PlaySound in its place.
+            - latency is checked but has no effect, winsound has no
+              buffer settings.
+    '''
+    __slots__ = ('_flags', '_kwargs', '_player', '_sound_file', '_thread',
+                 '_wait')
+    in_memory = True
+
+    def __init__(self, sound_file, wait=None, is_alias=None, **kwargs):
+        log.debug('initializing %s', self.__class__.__name__)
+        super().__init__(kwargs.get('latency'))
+        self._wait = kwargs.get('block', wait)  # compat with playsound
+        import winsound  # deferred
+
+        flags = 0  # figure flags
+        if isinstance(sound_file, PCMBuffer):
+            sound_file = to_wav(sound_file)
+        if is_alias:
+            log.debug('is alias: %r', sound_file)
+            flags |= winsound.SND_ALIAS
+        elif isinstance(sound_file, bytes):
+            log.debug('audio is an in-memory bytes object.')
+            flags |= winsound.SND_MEMORY
+        else:
+            log.debug('audio is a filename to load: %r', sound_file)
+            flags |= winsound.SND_FILENAME
+            sound_file = self._timed('verify_ms', self.verify_file,
+                                     sound_file)
+
+        log.debug('flags: %s', flags)
+        self._flags = flags
+        self._kwargs = kwargs
+        self._player = winsound
+        self._sound_file = sound_file
+        self._thread = None  # waiting on the latest play
+        self._initialized()
+
+    def play(self):
+        log.debug('playing: %r', self._sound_file)
+        if not self._wait:
+            log.debug('not waiting for audio to finish.')
+            self._start()
+            return self  # convenience
+        self._playback_started()
+        self._player.PlaySound(self._sound_file, self._flags)
+        self._playback_done()
+        return self  # convenience
+
+    def _start(self):
+        from threading import Thread  # deferred
+
+        self._playback_started()
+        self._thread = thread = Thread(target=self._play_waiting,
+                                       daemon=True)
+        thread.start()
+
+    def _play_waiting(self):
+        ''' Play to the end, or till stopped, then signal it, unless a
+            newer play cut this one short.
+        '''
+        from threading import current_thread  # deferred
+
+        self._player.PlaySound(self._sound_file, self._flags)
+        if current_thread() is self._thread:
+            self._playback_done()
+
+    async def play_async(self):
+        ''' winsound has no end notification, so a synchronous PlaySound
+            waits in the default executor.
+        '''
+        import asyncio  # deferred
+
+        log.debug('playing: %r', self._sound_file)
+        self._thread = None  # cut short, an earlier play doesn't signal
+        self._playback_started()
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._player.PlaySound, self._sound_file, self._flags)
+        self._playback_done()
+        return self  # convenience
+
+    def stop(self):
+        log.debug('stopping: %r', self._sound_file)
+        self._player.PlaySound(None, 0)
+        self._playback_done()
+
+    def play_tone(self, frequency_hz, duration_ms, **kwargs):
+        log.debug('trying winsound.Beep…')
+        self._player.Beep(frequency_hz, duration_ms)  # e.g. (1000, 500)
+
+    def play_sequence(self, notes, volume=0.2, sample_rate=22050,
+                      sample_width=1, fade_ms=5, **kwargs):
+        ''' Play a tone sequence from memory, see render_sequence.
+            Waits, as winsound can't play memory asynchronously.
+        '''
+        data = get_sequence(notes, volume, sample_rate, sample_width, fade_ms)
+        wav = to_wav(data, AudioFormat(sample_rate, 1, sample_width))
+        self._player.PlaySound(wav, self._player.SND_MEMORY)
+
+
+class MacOSBoomBox(_BoomBoxBase):
+    ''' Play an audio file on MacOS via PyObjC.
+
+        Arguments:
+
+            sound_file      May be a path, an alias, or bytes-like object of
+                            audio data.
+            wait            Wait to finish, or play in background & return now.
+
+        Notes:
+            - pip install PyObjC
+            - latency is checked but has no effect, NSSound has no
+              buffer settings.
+    '''
+    __slots__ = ('_player', '_sound_file', '_timer', '_wait')
+
+    def __init__(self, sound_file, wait=None, **kwargs):
+        from AppKit import NSSound  # deferred
+
+        log.debug('initializing %s', self.__class__.__name__)
+        super().__init__(kwargs.get('latency'))
+        self._sound_file = sound_file = self._timed(
+            'verify_ms', self.verify_file, sound_file)
+        self._wait = kwargs.get('block', wait)  # compat with playsound
+
+        self._player = NSSound.alloc()
+        self._timer = None  # to signal the end when not waiting
+        self._timed('open_ms',
+                    self._player.initWithContentsOfFile_byReference_,
+                    sound_file, True)
+        self._initialized()
+
+    def play(self):
+        log.debug('playing: %r', self._sound_file)
+        self._start()
+        if self._wait:
+            _sleep(self._player.duration())
+            self._playback_done()
+        else:  # no Cocoa run loop to hear the end on, time it
+            from threading import Timer  # deferred
+
+            self._timer = timer = Timer(self._player.duration(),
+                                        self._playback_done)
+            timer.daemon = True
+            timer.start()
+        return self  # convenience
+
+    def _start(self):
+        self._cancel_timer()
+        self._playback_started()
+        self._player.play()
+
+    def _cancel_timer(self):
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+    async def play_async(self):
+        ''' NSSound reports its end on a Cocoa run loop we may not have,
+            so its duration is awaited instead.
+        '''
+        import asyncio  # deferred
+
+        log.debug('playing: %r', self._sound_file)
+        self._start()
+        await asyncio.sleep(self._player.duration())
+        self._playback_done()
+        return self  # convenience
+
+    def stop(self):
+        log.debug('stopping: %r', self._sound_file)
+        self._cancel_timer()
+        self._player.stop()
+        self._playback_done()
+
+    def play_tone(self, frequency_hz, duration_ms, **kwargs):
+        ''' Generate a beep tone. '''
+        msg = 'Tone generation not yet implemented on darwin.'
+        log.warning(msg)
+        raise NotImplementedError(msg)
+
+
+# ---- POSIX -----------------------------------------------------------------
+@lru_cache(maxsize=None)
+def _gst():
+    ''' Import and initialize Gstreamer on first use, return Gst. '''
+    import gi  # deferred, slow
+    gi.require_version('Gst', '1.0')  # shrug
+    from gi.repository import Gst
+
+    log.debug('initializing Gstreamer.')
+    Gst.init(None)
+    return Gst
+
+
+class _BusRoute:
+    ''' Forwards bus messages to a swappable handler, held weakly as it
+        may be a method of a short-lived player.
+    '''
+    __slots__ = ('_target',)
+
+    def __init__(self, handler=None):
+        self.set(handler)
+
+    def set(self, handler):
+        from weakref import WeakMethod  # deferred
+
+        self._target = WeakMethod(handler) if handler else None
+
+    def __call__(self, bus, message):
+        method = self._target and self._target()
+        if method:
+            method(message)
+
+
+class _GLibLoop:
+    ''' A GLib main loop on a background thread, started on first use
+        and shared by all GstBoomBox pipelines to deliver bus messages.
+    '''
+    def __init__(self):
+        from threading import Lock  # deferred
+
+        self._lock = Lock()
+        self._loop = self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            from gi.repository import GLib  # deferred
+            from threading import Thread
+
+            log.debug('starting GLib main loop thread.')
+            self._loop = GLib.MainLoop()
+            self._thread = Thread(target=self._loop.run, daemon=True,
+                                  name='boombox-glib')
+            self._thread.start()
+
+    def watch(self, pipeline, handler=None):
+        ''' Route a pipeline's bus messages to handler(message), on the
+            loop thread.  Call once per pipeline, the returned route
+            may be pointed at another handler later.
+        '''
+        self.start()
+        route = _BusRoute(handler)
+        bus = pipeline.get_bus()
+        bus.add_signal_watch()
+        bus.connect('message', route)
+        return route
+
+    def call_later(self, seconds, func):
+        ''' Run func on the loop thread, repeating while it returns True.
+        '''
+        from gi.repository import GLib  # deferred
+
+        self.start()
+        return GLib.timeout_add(int(seconds * 1000), func)
+
+    def stop(self):
+        with self._lock:
+            if self._loop:
+                self._loop.quit()
+                self._thread.join(1)
+            self._loop = self._thread = None
+
+
+_glib_loop = _GLibLoop()
+
+
+def _make_playbin(uri, audio_sink=None, latency_ms=None, effects=False):
+    ''' Create a playbin for uri, with an optional sink description,
+        e.g. 'fakesink sync=true', or element, or a list of them to fan
+        out to, and latency target.
+        effects adds an audio filter of 'pan' and 'gain' elements.
+    '''
+    Gst = _gst()
+    playbin = Gst.ElementFactory.make('playbin', None)
+    if uri:
+        playbin.props.uri = uri
+    if audio_sink is not None:
+        if isinstance(audio_sink, (list, tuple)):
+            audio_sink = _fan_out_sink(Gst, audio_sink)
+        elif isinstance(audio_sink, str):
+            audio_sink = Gst.parse_launch(audio_sink)
+        playbin.props.audio_sink = audio_sink
+    if effects:
+        playbin.props.audio_filter = Gst.parse_bin_from_description(
+            'audioconvert ! audiopanorama name=pan method=simple ! '
+            'volume name=gain', True)
+    if latency_ms is not None:  # on the sink, once autoaudiosink picks it
+        playbin.connect('deep-element-added', _tune_sink,
+                        int(latency_ms * 1000))
+    return playbin
+
+
+def _fan_out_sink(Gst, sinks):
+    ''' Return a bin teeing into each sink, on one clock, so they play in
+        step.  Each sits behind a leaky queue, so one falling behind
+        doesn't hold up the rest, and those that won't open are left out.
+    '''
+    fan = Gst.Bin.new('fan-out')
+    tee = Gst.ElementFactory.make('tee', 'tee')
+    tee.props.allow_not_linked = True
+    fan.add(tee)
+    for number, sink in enumerate(sinks):
+        if isinstance(sink, str):
+            sink = Gst.parse_bin_from_description(sink, True)
+        queue = Gst.ElementFactory.make('queue', None)
+        queue.props.leaky = 2  # downstream, drop the oldest
+        queue.props.max_size_time = 200 * Gst.MSECOND
+        queue.props.max_size_buffers = queue.props.max_size_bytes = 0
+        elements = (queue, Gst.ElementFactory.make('audioconvert', None),
+                    Gst.ElementFactory.make('audioresample', None), sink)
+        branch = Gst.Bin.new('branch%s' % number)
+        for element in elements:
+            branch.add(element)
+        for upstream, downstream in zip(elements, elements[1:]):
+            upstream.link(downstream)
+        branch.add_pad(Gst.GhostPad.new('sink', queue.get_static_pad('sink')))
+        if branch.set_state(Gst.State.READY) == \
+           Gst.StateChangeReturn.FAILURE:  # the device, likely
+            log.warning('audio sink %s left out, it would not open.',
+                        sinks[number])
+            branch.set_state(Gst.State.NULL)
+            continue
+        fan.add(branch)
+        tee.link(branch)  # requests a pad
+    fan.add_pad(Gst.GhostPad.new('sink', tee.get_static_pad('sink')))
+    return fan
+
+
+def _drop_branch(playbin, element):
+    ''' Unlink the fan-out branch holding a failed element, if others
+        remain to play on.  Returns whether it was dropped.
+    '''
+    fan = playbin.props.audio_sink
+    if fan is None or fan.get_name() != 'fan-out':
+        return False
+    branch = element
+    while branch is not None and branch.get_parent() is not fan:
+        branch = branch.get_parent()
+    if branch is None or branch.get_name() == 'tee':
+        return False
+    if len(list(fan.iterate_elements())) <= 2:  # the tee and this one
+        return False
+    log.warning('audio sink failed, %s left out.', branch.get_name())
+    tee = fan.get_by_name('tee')
+    tee_pad = branch.get_static_pad('sink').get_peer()
+    if tee_pad is not None:
+        tee_pad.unlink(branch.get_static_pad('sink'))
+        tee.release_request_pad(tee_pad)
+    branch.set_locked_state(True)
+    branch.set_state(_gst().State.NULL)
+    fan.remove(branch)
+    return True
+
+
+def _tune_sink(playbin, sub_bin, element, buffer_us):
+    ''' Size the ring buffer of an audio sink as it is added. '''
+    if element.find_property('buffer-time') is not None:
+        log.debug('%s buffer-time: %s µs', element.get_name(), buffer_us)
+        element.props.buffer_time = buffer_us
+        element.props.latency_time = max(1000, buffer_us // 4)
+
+
+def _sink_latency_ms(playbin):
+    ''' Return the buffer time of the audio sink in use, in ms, if any. '''
+    for element in playbin.iterate_recurse():
+        if element.find_property('buffer-time') is not None:
+            return element.props.buffer_time / 1000
+    return None
+
+
+def _pcm_caps(format):
+    ''' Return a caps string for raw PCM of an AudioFormat. '''
+    sample_format = {1: 'U8', 2: 'S16LE', 3: 'S24LE', 4: 'S32LE'}
+    return ('audio/x-raw,format=%s,rate=%s,channels=%s,layout=interleaved'
+            % (sample_format[format.sample_width], format.sample_rate,
+               format.channels))
+
+
+def _feed_appsrc(playbin, source, pcm):
+    ''' Push in-memory audio through the appsrc of an appsrc:// playbin,
+        on each start.  Runs as its source-setup handler.
+    '''
+    Gst = _gst()
+    data, caps, duration = pcm
+    source.props.caps = Gst.Caps.from_string(caps)
+    source.props.format = Gst.Format.TIME
+    buffer = Gst.Buffer.new_wrapped(data)
+    buffer.pts = 0
+    buffer.duration = duration
+    source.emit('push-buffer', buffer)
+    source.emit('end-of-stream')
+
+
+def _stream_appsrc(playbin, source, stream):
+    ''' Pull a PCMStream through the appsrc of an appsrc:// playbin,
+        as it asks for data.  Runs as its source-setup handler.
+    '''
+    Gst = _gst()
+    source.props.caps = Gst.Caps.from_string(_pcm_caps(stream.format))
+    source.props.format = Gst.Format.TIME
+    source.connect('need-data', _pull_appsrc, stream)
+    stream.start()
+
+
+def _pull_appsrc(source, length, stream):
+    ''' Push the next chunk, waiting on the producer, or end the stream.
+        Runs on the appsrc's streaming thread.
+    '''
+    Gst = _gst()
+    rate = stream.format.sample_rate
+    start = stream.tell()
+    data = stream.pull(max(length, stream.format.frame_size))
+    if not data:
+        source.emit('end-of-stream')
+        return
+    buffer = Gst.Buffer.new_wrapped(data)
+    buffer.pts = start * Gst.SECOND // rate
+    buffer.duration = (stream.tell() - start) * Gst.SECOND // rate
+    source.emit('push-buffer', buffer)
+
+
+def _rewind(playbin):
+    ''' Hold a playbin prerolled at the start, ready to play.
+        Clears the stop position of a segment seek.
+    '''
+    Gst = _gst()
+    playbin.set_state(Gst.State.PAUSED)
+    playbin.seek(1.0, Gst.Format.TIME,
+                 Gst.SeekFlags.FLUSH | Gst.SeekFlags.KEY_UNIT,
+                 Gst.SeekType.SET, 0, Gst.SeekType.SET, -1)
+
+
+class _PlaybinPool:
+    ''' Idle, prerolled playbins keyed by URI, handed to new players.
+
+        Arguments:
+
+            max_idle        Seconds an idle playbin is kept, as a
+                            prerolled pipeline holds the audio device.
+            max_size        Most idle playbins kept, oldest go first.
+    '''
+    def __init__(self, max_idle=30, max_size=16):
+        from threading import Lock  # deferred
+
+        self.max_idle = max_idle
+        self.max_size = max_size
+        self.hits = self.misses = self.evictions = 0
+        self._idle = {}  # (uri, sink, latency, effects): [(playbin, ...)]
+        self._lock = Lock()
+        self._sweeping = False
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._idle.values())
+
+    def acquire(self, uri, audio_sink=None, latency_ms=None, effects=False):
+        ''' Return a prerolled (playbin, route), from the pool if any. '''
+        key = (uri, audio_sink, latency_ms, effects)
+        with self._lock:
+            self._evict()
+            entries = self._idle.get(key)
+            if entries:
+                self.hits += 1
+                playbin, route, _ = entries.pop()
+                return playbin, route
+            self.misses += 1
+
+        log.debug('prerolling: %r', uri)
+        playbin = _make_playbin(uri, audio_sink, latency_ms, effects)
+        route = _glib_loop.watch(playbin)
+        playbin.set_state(_gst().State.PAUSED)  # preroll in background
+        return playbin, route
+
+    def release(self, uri, audio_sink, playbin, route, latency_ms=None,
+                effects=False):
+        ''' Return a playbin to the pool, rewound and prerolled. '''
+        route.set(None)
+        sinks = audio_sink if isinstance(audio_sink, tuple) else (audio_sink,)
+        if not all(isinstance(sink, (str, type(None))) for sink in sinks):
+            playbin.set_state(_gst().State.NULL)  # elements can't be shared
+            return
+        _rewind(playbin)
+        with self._lock:
+            entry = (playbin, route, monotonic())
+            key = (uri, audio_sink, latency_ms, effects)
+            self._idle.setdefault(key, []).append(entry)
+            self._evict()
+            if not self._sweeping:
+                self._sweeping = True
+                _glib_loop.call_later(self.max_idle / 2, self._sweep)
+
+    def clear(self):
+        ''' Drop all idle playbins, releasing their devices. '''
+        with self._lock:
+            for entries in self._idle.values():
+                for playbin, _, _ in entries:
+                    playbin.set_state(_gst().State.NULL)
+            self._idle.clear()
+
+    def _sweep(self):  # on the loop thread
+        with self._lock:
+            self._evict()
+            self._sweeping = bool(self._idle)
+            return self._sweeping  # repeat?
+
+    def _evict(self):  # lock held
+        expired = monotonic() - self.max_idle
+        entries = sorted(
+            (released, key, index)
+            for key, items in self._idle.items()
+            for index, (_, _, released) in enumerate(items)
+        )
+        excess = len(entries) - self.max_size
+        doomed = [(key, index) for n, (released, key, index)
+                  in enumerate(entries)
+                  if n < excess or released < expired]
+        for key, index in sorted(doomed, reverse=True):
+            playbin, _, _ = self._idle[key].pop(index)
+            playbin.set_state(_gst().State.NULL)
+            self.evictions += 1
+        for key in [key for key, items in self._idle.items()
+                    if not items]:
+            del self._idle[key]
+
+
+_playbin_pool = _PlaybinPool()
+
+
+class GstBoomBox(_BoomBoxBase):
+    ''' Play an audio file (ogg, wav, mp3, etc) via the Gstreamer system.
+
+        To wait, set wait=True.
+        To wait, limited to a maximum amount of time, use duration_ms.
+
+        With preroll=True the pipeline is kept prerolled in PAUSED and
+        rewound with a flushing seek, rather than torn down to NULL.
+        Pipelines come from and go back to a pool shared by URI,
+        see GstBoomBox.pool, so a new player for a recent sound starts
+        at once.  audio_sink takes a sink description or element,
+        e.g. 'fakesink' for headless use, or a list of them to play to
+        all at once.  The sound is decoded once and teed to each, in step
+        on the pipeline clock; one that fails is dropped, the rest play
+        on.
+
+        play() takes a cue name from cues, a map of
+        name: (start_ms, end_ms), or the offsets directly, to play a
+        segment of one "sprite" file with an accurate seek of the
+        prerolled pipeline.  Switching cues reopens nothing.
+
+        sound_file may also be a PCMBuffer, pushed through an appsrc on
+        each start, or a PCMStream, or a source of PCM chunks given with
+        format, pulled through one as the sink asks.  Those are not
+        prerolled, as appsrc can't seek back.
+
+        The pipeline is built on first play, unless prerolled.
+
+        effects takes an Effects, played through volume and audiopanorama
+        elements.  Fades are put on the volume's controller in stream
+        time, from the start of the play to the end of it, or of the
+        file once its duration is known.
+    '''
+    __slots__ = ('_EOS', '_appsrc', '_at_start', '_audio_sink',
+                 '_duration_ms', '_fader', '_gst', '_pan', '_playbin',
+                 '_player', '_playing', '_preroll', '_route', '_sequence',
+                 '_sequence_ended', '_sound_file', '_span_ms', '_stopped', '_tone_caps',
+                 '_tone_ended', '_tone_spec', '_tone_src', '_uri', '_wait',
+                 'cues', 'effects')
+    pool = _playbin_pool
+    in_memory = True
+
+    def __init__(self, sound_file, wait=None, duration_ms=None,
+                 preroll=False, audio_sink=None, format=None, cues=None,
+                 latency=None, effects=None, **kwargs):
+        log.debug('initializing %s', self.__class__.__name__)
+        super().__init__(latency)
+        self._gst = Gst = _gst()  # somebody set us up the bomb!
+        self._appsrc = None  # (source-setup handler, its data)
+
+        sound_file = _as_stream(sound_file, format)
+        if isinstance(sound_file, PCMBuffer):
+            self._sound_file = sound_file
+            self._appsrc = (_feed_appsrc, (
+                sound_file.data.tobytes(),
+                _pcm_caps(sound_file.format),
+                sound_file.frames * Gst.SECOND
+                // sound_file.format.sample_rate,
+            ))
+            uri = 'appsrc://'
+            preroll = False
+        elif isinstance(sound_file, PCMStream):
+            self._sound_file = sound_file
+            self._appsrc = (_stream_appsrc, sound_file)
+            uri = 'appsrc://'
+            preroll = False
+        else:
+            self._sound_file = sound_file = self._timed(
+                'verify_ms', self.verify_file, sound_file)
+            if sound_file.startswith(('http://', 'https://')):
+                uri = sound_file
+            else:
+                uri = 'file://' + sound_file
+        self._uri = uri
+        if isinstance(audio_sink, list):
+            audio_sink = tuple(audio_sink)  # a pool key
+        self._audio_sink = audio_sink
+        self._preroll = preroll
+        self.cues = dict(cues or {})
+        self.effects = effects
+        self._fader = self._pan = None  # volume's control source, panorama
+        self._span_ms = (0, None)
 
-    def play_tone(self, **kwargs):
-        ''' Generate a tone for beep or ring-like purposes. '''
-        msg = 'play_tone() not implemented, is PyAudio installed?'
-        raise NotImplementedError(msg)
+        self._wait = kwargs.get('block', wait)  # compat with playsound
+        self._duration_ms = duration_ms
+        self._playing = Gst.State.PLAYING
+        self._stopped = Gst.State.NULL
+        self._EOS = Gst.MessageType.EOS  # end of stream-kowski
+        if self.stats is not None and audio_sink is None:
+            self._audio_sink = 'autoaudiosink'  # the default, to probe
+        self._playbin = self._route = None
+        if preroll:  # ready now, to start at once
+            self.handles.touch(self)
+            self._timed('open_ms', self._acquire)
+        self._initialized()
 
-    def play(self):
-        raise NotImplementedError('play() not yet implemented.')
-        return self  # convenience
+    def _acquire(self):
+        effects = self.effects is not None
+        if self._preroll:
+            self._playbin, self._route = self.pool.acquire(
+                self._uri, self._audio_sink, self._latency, effects)
+            self._route.set(self._on_message)
+        else:
+            self._playbin = _make_playbin(self._uri, self._audio_sink,
+                                          self._latency, effects)
+            self._route = _glib_loop.watch(self._playbin,
+                                           self._on_message)
+            if self._appsrc:
+                self._playbin.connect('source-setup', *self._appsrc)
+        if effects:
+            self._bind_effects()
+        self._at_start = True
+
+    def _bind_effects(self):
+        ''' Find the filter's elements, put a control source on the gain.
+        '''
+        import gi  # deferred
+        gi.require_version('GstController', '1.0')
+        from gi.repository import GstController
+
+        audio_filter = self._playbin.props.audio_filter
+        gain = audio_filter.get_by_name('gain')
+        self._pan = audio_filter.get_by_name('pan')
+        self._fader = fader = GstController.InterpolationControlSource()
+        fader.props.mode = GstController.InterpolationMode.LINEAR
+        gain.add_control_binding(GstController.DirectControlBinding
+                                 .new_absolute(gain, 'volume', fader))
+        self.effects._players.add(self)
+        self._apply_effects()
+
+    def _effects_changed(self):
+        if self._fader is not None:
+            self._apply_effects()
+
+    def _apply_effects(self):
+        ''' Set the pan, and gain and fades as control points. '''
+        Gst, effects = self._gst, self.effects
+        self._pan.props.panorama = max(-1.0, min(1.0, float(effects.pan)))
+        gain = float(effects.gain)
+        start_ms, end_ms = self._span_ms
+        fader = self._fader
+        fader.unset_all()
+        if effects.fade_in_ms:
+            fader.set(int(start_ms * Gst.MSECOND), 0.0)
+            start_ms += effects.fade_in_ms
+        fader.set(int(start_ms * Gst.MSECOND), gain)
+        if effects.fade_out_ms:
+            if end_ms is None:
+                end_ms = self._end_ms()
+            if end_ms is not None:
+                fade_ms = max(start_ms, end_ms - effects.fade_out_ms)
+                fader.set(int(fade_ms * Gst.MSECOND), gain)
+                fader.set(int(end_ms * Gst.MSECOND), 0.0)
+
+    def _end_ms(self):
+        ''' Length of the sound in ms, if known yet. '''
+        Gst = self._gst
+        if isinstance(self._sound_file, PCMBuffer):
+            return self._appsrc[1][2] / Gst.MSECOND
+        known, duration = self._playbin.query_duration(Gst.Format.TIME)
+        return duration / Gst.MSECOND if known and duration > 0 else None
+
+    def _on_message(self, message):
+        ''' Reset playback at end of stream or error, wake waiters.
+            Runs on the GLib loop thread.
+        '''
+        MessageType = self._gst.MessageType
+        mtype = message.type
+        if mtype == MessageType.EOS:
+            self._reset()
+            log.debug('end of stream: %r', self._sound_file)
+            self._playback_done()
+        elif mtype == MessageType.ERROR:
+            err, debug = message.parse_error()
+            log.error('%r: %r' % (err, debug))
+            if _drop_branch(self._playbin, message.src):
+                return  # one of several sinks, play on
+            self._playbin.set_state(self._stopped)
+            self._playback_done(RuntimeError(err.message))
+        elif mtype == MessageType.ASYNC_DONE and self._fader is not None:
+            self._apply_effects()  # duration known now, for the fade out
+
+    def _reset(self):
+        ''' Back to the start: prerolled if asked for, else NULL. '''
+        if self._playbin is None:
+            return
+        if self._preroll:
+            _rewind(self._playbin)
+            self._at_start = True
+        else:
+            self._playbin.set_state(self._stopped)
+
+    def play(self, cue=None, start_ms=None, end_ms=None):
+        ''' Play the sound, or a segment of it by cue name or offsets. '''
+        log.debug('playing: %r', self._sound_file)
+        self._start(self._span(cue, start_ms, end_ms))
+        if self._wait:
+            if self._duration_ms:
+                log.debug('timeout is %s ms', self._duration_ms)
+                timeout = self._duration_ms / 1000
+            else:  # could hang if in wrong state
+                log.debug('waiting for sound to end…')
+                timeout = None
+
+            if not self._ended.wait(timeout):  # set at end of stream
+                log.debug('timed out, stopping.')
+                self._reset()
+                self._playback_done()
+            else:
+                self._reset()
+        return self  # convenience
+
+    def _start(self, span=None):
+        self.handles.touch(self)
+        if self._playbin is None:  # first play, or closed since
+            self._timed('open_ms', self._acquire)
+        playbin = self._playbin
+        self._span_ms = span or (0, None)
+        if self._fader is not None:
+            self._apply_effects()
+        if span:
+            self._seek(playbin, *span)
+        elif not self._preroll:
+            playbin.set_state(self._stopped)  # rewind
+        elif not self._at_start:
+            _rewind(playbin)
+        self._at_start = False
+        self._playback_started()
+        if self.stats is not None:
+            self._probe_first_buffer(playbin)
+        result = playbin.set_state(self._playing)
+        if result == self._gst.StateChangeReturn.FAILURE:
+            raise RuntimeError('playbin.set_state returned: %r' % result)
+
+    @property
+    def latency_ms(self):
+        ''' The audio sink's buffer time, once the pipeline has one. '''
+        playbin = self._playbin
+        return None if playbin is None else _sink_latency_ms(playbin)
+
+    def _probe_first_buffer(self, playbin):
+        ''' Time the next buffer to reach the audio sink, once. '''
+        import weakref  # deferred
+
+        Gst = self._gst
+        pad = playbin.props.audio_sink.get_static_pad('sink')
+        player = weakref.ref(self)
+
+        def probe(pad, info):
+            if player():
+                player()._first_buffer()
+            return Gst.PadProbeReturn.REMOVE
+
+        pad.add_probe(Gst.PadProbeType.BUFFER, probe)
+
+    def _seek(self, playbin, start_ms, end_ms):
+        ''' Preroll if need be, then seek to a segment, which ends in EOS. '''
+        Gst = self._gst
+        if self._appsrc:
+            raise ValueError('in-memory audio has no segments.')
+        if not self._preroll:
+            playbin.set_state(self._stopped)  # from the top, as usual
+        playbin.set_state(Gst.State.PAUSED)
+        result, _, _ = playbin.get_state(Gst.CLOCK_TIME_NONE)  # prerolled
+        if result == Gst.StateChangeReturn.FAILURE:
+            raise RuntimeError('playbin.get_state returned: %r' % result)
+
+        log.debug('segment: %s–%s ms', start_ms, end_ms)
+        if not playbin.seek(
+            1.0, Gst.Format.TIME,
+            Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE,
+            Gst.SeekType.SET, int(start_ms * Gst.MSECOND),
+            Gst.SeekType.SET, -1 if end_ms is None else
+                              int(end_ms * Gst.MSECOND),
+        ):
+            raise RuntimeError('seek to %s–%s ms failed.'
+                               % (start_ms, end_ms))
+
+    def close(self):
+        ''' Release the pipeline, prerolled ones go back to the pool. '''
+        self.handles.discard(self)
+        playbin, self._playbin = getattr(self, '_playbin', None), None
+        if playbin is not None:
+            if isinstance(self._sound_file, PCMStream):
+                self._sound_file.close()  # unblock the streaming thread
+            if self._fader is not None:
+                self.effects._players.discard(self)
+                self._fader = self._pan = None
+            if self._preroll:
+                self.pool.release(self._uri, self._audio_sink, playbin,
+                                  self._route, self._latency,
+                                  self.effects is not None)
+            else:
+                playbin.set_state(self._stopped)
+        if getattr(self, '_player', None):
+            self._player.set_state(self._stopped)
+        if getattr(self, '_sequence', None):
+            self._sequence.set_state(self._stopped)
+
+    def __del__(self):
+        self.close()
 
     def stop(self):
-        raise NotImplementedError('stop() not yet implemented.')
+        log.debug('stopping: %r', self._sound_file)
+        if isinstance(self._sound_file, PCMStream):
+            self._sound_file.close()  # live, can't resume anyway
+        self._reset()
+        if getattr(self, '_player', None):
+            self._player.set_state(self._gst.State.READY)
+            self._tone_ended.set()
+        if getattr(self, '_sequence', None):
+            self._sequence.set_state(self._gst.State.READY)
+            self._sequence_ended.set()
+        self._playback_done()
 
-    def verify_file(self, path):
-        ''' Check file is accessible, early on.  Prone to race conditions. '''
-        path = abspath(path)
-        if not exists(path):
-            raise FileNotFoundError(repr(path))
-        if not os.access(path, os.R_OK):
-            raise PermissionError(repr(path))
-        if not os.path.getsize(path):
-            raise EOFError(repr(path))
-        if os.name == 'nt':
-            path = path.replace('\\', '/')  # :-/
-        log.debug('verified: %r', path)
-        return path
+    def play_tone(self, frequency_hz, duration_ms, volume=0.2,
+                  sample_rate=22050, sample_width=1, **kwargs):
+        ''' Play a tone on the instance's long-lived tone pipeline.
 
+            Arguments are the same as PyAudioBoomBox.play_tone.
+            Frequency and volume are live property updates, the length
+            is an exact count of samples ending in EOS, after which the
+            pipeline idles in READY for the next one.  It plays to a sink
+            like audio_sink, tuned to latency.
+        '''
+        _check_width(sample_width)
+        num_samples = int(sample_rate * duration_ms / 1000)
+        if num_samples < 1:
+            return
+        player = self._tone_player()
+        source = self._tone_src
+        source.props.freq = frequency_hz
+        source.props.volume = volume
 
-class WinBoomBox(_BoomBoxBase):
-    ''' Play an audio file via the winsound module.
+        buffers, per_buffer = _split_samples(num_samples)
+        source.props.num_buffers = buffers
+        source.props.samplesperbuffer = per_buffer
+        spec = (sample_rate, sample_width)
+        Gst = self._gst
+        if spec != self._tone_spec:  # renegotiate only on change
+            self._tone_caps.props.caps = Gst.Caps.from_string(
+                'audio/x-raw,format=%s,rate=%s,channels=1'
+                % ('U8' if sample_width == 1 else 'S16LE', sample_rate)
+            )
+            self._tone_spec = spec
+
+        self._tone_ended.clear()
+        player.set_state(Gst.State.READY)  # if still running
+        result = player.set_state(self._playing)
+        if result == self._gst.StateChangeReturn.FAILURE:
+            raise RuntimeError('player.set_state returned: %r' % result)
+        if self._wait:
+            self._tone_ended.wait()
+
+    def play_sequence(self, notes, volume=0.2, sample_rate=22050,
+                      sample_width=1, fade_ms=5, **kwargs):
+        ''' Play a sequence of tones, rendered into one buffer and pushed
+            through the instance's long-lived appsrc pipeline, which idles
+            in READY between them like the tone one.  See render_sequence.
+        '''
+        data = get_sequence(notes, volume, sample_rate, sample_width, fade_ms)
+        if not data:
+            return
+        Gst = self._gst
+        player = self._sequence_player()
+        self._sequence_ended.clear()
+        player.set_state(Gst.State.READY)  # if still running
+        result = player.set_state(self._playing)
+        if result == Gst.StateChangeReturn.FAILURE:
+            raise RuntimeError('player.set_state returned: %r' % result)
+        _feed_appsrc(player, player.get_by_name('source'), (  # once started
+            data,
+            _pcm_caps(AudioFormat(sample_rate, 1, sample_width)),
+            len(data) // sample_width * Gst.SECOND // sample_rate,
+        ))
+        if self._wait:
+            self._sequence_ended.wait()
+
+    def _tone_player(self):
+        ''' Build the tone pipeline on first use, then reuse it. '''
+        player = getattr(self, '_player', None)
+        if player is None:
+            from threading import Event  # deferred
+
+            log.debug('building tone pipeline.')
+            self._tone_ended = Event()
+            self._player = player = self._output_pipeline(
+                'audiotestsrc name=source wave=sine ! capsfilter name=caps',
+                self._on_tone_message)
+            self._tone_src = player.get_by_name('source')
+            self._tone_caps = player.get_by_name('caps')
+            self._tone_spec = None
+        return player
+
+    def _sequence_player(self):
+        ''' Build the sequence pipeline on first use, then reuse it. '''
+        player = getattr(self, '_sequence', None)
+        if player is None:
+            from threading import Event  # deferred
+
+            log.debug('building sequence pipeline.')
+            self._sequence_ended = Event()
+            self._sequence = player = self._output_pipeline(
+                'appsrc name=source', self._on_sequence_message)
+        return player
+
+    def _output_pipeline(self, source, handler):
+        ''' Build a pipeline from a source description, converted for a
+            sink like audio_sink, tuned to latency, and watch its bus.
+        '''
+        Gst = self._gst
+        player = Gst.parse_launch(
+            source + ' ! audioconvert ! audioresample name=resample')
+        if self._latency is not None:  # as _make_playbin
+            buffer_us = int(self._latency * 1000)
+            player.connect('deep-element-added', _tune_sink, buffer_us)
+        sink = self._tone_sink()
+        player.add(sink)
+        if self._latency is not None:
+            _tune_sink(player, player, sink, buffer_us)
+        player.get_by_name('resample').link(sink)
+        _glib_loop.watch(player, handler)
+        return player
+
+    def _tone_sink(self):
+        ''' A sink for tones like audio_sink, but its own, as elements
+            can't be in two pipelines.  Elements given are remade by kind.
+        '''
+        Gst = self._gst
+
+        def remake(sink):
+            if isinstance(sink, str):
+                return sink
+            return sink.get_factory().create(None)
+
+        audio_sink = self._audio_sink
+        if audio_sink is None:
+            return Gst.ElementFactory.make('autoaudiosink', 'output')
+        if isinstance(audio_sink, (list, tuple)):
+            return _fan_out_sink(Gst, [remake(sink) for sink in audio_sink])
+        audio_sink = remake(audio_sink)
+        if isinstance(audio_sink, str):
+            return Gst.parse_bin_from_description(audio_sink, True)
+        return audio_sink
+
+    def _on_tone_message(self, message):
+        self._idle_on_end(self._player, self._tone_ended, message)
+
+    def _on_sequence_message(self, message):
+        self._idle_on_end(self._sequence, self._sequence_ended, message)
+
+    def _idle_on_end(self, player, ended, message):
+        ''' At the end of a tone or sequence, or on error, idle. '''
+        mtype = message.type
+        if mtype in (self._EOS, self._gst.MessageType.ERROR):
+            if mtype != self._EOS:
+                err, debug = message.parse_error()
+                log.error('%r: %r' % (err, debug))
+            # READY resets the source's buffer count, keeps the elements
+            player.set_state(self._gst.State.READY)
+            ended.set()
+
+
+def _split_samples(num_samples, most=2048):
+    ''' Split a sample count into (buffers, samples per buffer), exactly
+        when a divisor allows, else rounded up by less than a buffer.
+    '''
+    fewest = max(1, -(-num_samples // most))  # ceiling
+    for buffers in range(fewest, fewest * 4 + 1):
+        if not num_samples % buffers:
+            return buffers, num_samples // buffers
+    return fewest, -(-num_samples // fewest)
+
+
+class _GstQueueOutput:
+    ''' PlaybackQueue output on one playbin.  The next URI is handed over
+        at about-to-finish, so playbin prerolls it while the current one
+        plays, and joins them without a gap.
+    '''
+    def __init__(self, queue, audio_sink=None, format=None, latency=None,
+                 **kwargs):
+        self._queue = queue
+        self._gst = _gst()
+        self._playbin = playbin = _make_playbin(None, audio_sink,
+                                                _latency_ms(latency))
+        self._route = _glib_loop.watch(playbin, self._on_message)
+        self._handler = playbin.connect('about-to-finish',
+                                        self._about_to_finish)
+
+    @staticmethod
+    def check(sound):
+        ''' Return the URI to queue for a sound. '''
+        if isinstance(sound, (PCMBuffer, PCMStream)):
+            raise TypeError('Gstreamer queues take files or URIs.')
+        if sound.startswith(('http://', 'https://', 'file://')):
+            return sound
+        return 'file://' + _BoomBoxBase.verify_file(sound)
+
+    def prefetch(self):
+        pass  # playbin does, once given the next URI
+
+    def start(self):
+        ''' Play the next URI from the top, or go idle. '''
+        Gst = self._gst
+        playbin = self._playbin
+        playbin.set_state(Gst.State.NULL)
+        uri = self._queue._take(idle=True)
+        if uri is None:
+            return
+        log.debug('queue playing: %r', uri)
+        playbin.props.uri = uri
+        if playbin.set_state(Gst.State.PLAYING) == \
+           Gst.StateChangeReturn.FAILURE:
+            raise RuntimeError('could not play: %r' % uri)
+
+    def _about_to_finish(self, playbin):
+        ''' On a streaming thread, set the next URI if there is one. '''
+        uri = self._queue._take()
+        if uri is not None:
+            log.debug('queue next: %r', uri)
+            playbin.props.uri = uri
+            self._queue.played += 1
+
+    def _on_message(self, message):
+        MessageType = self._gst.MessageType
+        if message.type == MessageType.EOS:
+            self._queue.played += 1
+            self.start()  # any that came too late for about-to-finish
+        elif message.type == MessageType.ERROR:
+            err, debug = message.parse_error()
+            log.error('%r: %r' % (err, debug))
+            self.start()  # carry on with the next
+
+    def skip(self):
+        self.start()
+
+    @property
+    def latency_ms(self):
+        return _sink_latency_ms(self._playbin)
+
+    def stop(self):
+        self._playbin.set_state(self._gst.State.NULL)
+
+    def close(self):
+        if self._playbin is not None:
+            self._playbin.disconnect(self._handler)
+            self.stop()
+            self._playbin = None
+
+
+
+# ---- X-Plaform -------------------------------------------------------------
+class _PyAudioEngine:
+    ''' The process-wide PortAudio engine, shared by all PyAudio players.
+
+        Created on first acquire(), counted, and kept warm when the count
+        drops to zero.  Torn down once, at exit or by an explicit
+        terminate().  Device info is probed once and cached.
+    '''
+    def __init__(self):
+        from threading import RLock  # deferred
+
+        self.users = 0
+        self._lock = RLock()
+        self._pa = None
+        self._devices = self._default_output = None
+
+    def acquire(self):
+        ''' Return the shared PyAudio instance, creating it on first use. '''
+        with self._lock:
+            if self._pa is None:
+                self._pa = self._start()
+            self.users += 1
+            return self._pa
+
+    def release(self):
+        with self._lock:
+            self.users = max(0, self.users - 1)
+
+    def devices(self):
+        ''' Return a tuple of device info dictionaries, probed once. '''
+        with self._lock:
+            if self._devices is None:
+                pa = self.acquire()
+                try:
+                    self._devices = tuple(
+                        pa.get_device_info_by_index(i)
+                        for i in range(pa.get_device_count())
+                    )
+                finally:
+                    self.release()
+            return self._devices
+
+    def default_output(self):
+        ''' Return info of the default output device, or None. '''
+        with self._lock:
+            if self._default_output is None:
+                pa = self.acquire()
+                try:
+                    self._default_output = pa.get_default_output_device_info()
+                except OSError:  # none available
+                    self._default_output = {}
+                finally:
+                    self.release()
+            return self._default_output or None
+
+    def output_index(self, device):
+        ''' Return the index of an output device, given as an index or
+            part of its name.
+        '''
+        if isinstance(device, int):
+            return device
+        for info in self.devices():
+            if info.get('maxOutputChannels') and device in info['name']:
+                return info['index']
+        raise ValueError('no output device named %r.' % device)
+
+    def native_format(self, index=None):
+        ''' Return the default output's format, or a device's by index:
+            its rate, mono or stereo, and 16-bit, which PortAudio doesn't
+            report but all take.
+        '''
+        if index is None:
+            info = self.default_output() or {}
+        else:
+            info = self.devices()[index]
+        return AudioFormat(int(info.get('defaultSampleRate', 44_100)),
+                           min(2, info.get('maxOutputChannels') or 2), 2)
+
+    def terminate(self, force=False):
+        ''' Shut down PortAudio, if no players are still using it. '''
+        with self._lock:
+            if self._pa is None:
+                return
+            if self.users and not force:
+                raise RuntimeError('PyAudio engine has %s users' % self.users)
+            log.debug('terminating PyAudio.')
+            self._pa.terminate()
+            self._pa = self._devices = self._default_output = None
+            self.users = 0
+
+    @staticmethod
+    def _start():
+        from pyaudio import PyAudio  # deferred
+
+        log.debug('setting up PyAudio.')
+        sys.stderr.flush()
+        with open(os.devnull, 'w') as devnull:  # hide diag on stderr :-/
+            orig_stderr_fno = os.dup(2)
+            os.dup2(devnull.fileno(), 2)
+            try:
+                return PyAudio()  # <-- lots of output here :-(
+            finally:
+                os.dup2(orig_stderr_fno, 2)
+                os.close(orig_stderr_fno)
+
+
+_pa_engine = _PyAudioEngine()
+
+
+def _pa_frames(latency_ms, sample_rate):
+    ''' Frames per buffer for a latency target, as two buffers are queued.
+        0 is paFramesPerBufferUnspecified, PortAudio's choice.
+    '''
+    if latency_ms is None:
+        return 0
+    return max(32, int(sample_rate * latency_ms / 2000))
+
+
+@atexit.register
+def _terminate_engines():
+    _pa_engine.terminate(force=True)
+
+
+class Voice:
+    ''' A sound playing on a Mixer, returned by Mixer.play(). '''
+    def __init__(self, mixer, source, gain=1.0, loop=False, on_done=None,
+                 on_start=None):
+        from threading import Event  # deferred
+
+        self.source = source
+        self.gain = gain
+        self.loop = loop
+        self.done = Event()
+        self._mixer = mixer
+        self._on_done = on_done
+        self._on_start = on_start  # first read, e.g. for latency
+        self._pending = bytearray()
+        self._frame_size = mixer.format.frame_size
+        self._ratio = source.format.sample_rate / mixer.format.sample_rate
+        if source.format == mixer.format:
+            self._converter = None
+        else:
+            self._converter = PCMConverter(source.format, mixer.format)
+
+    def __repr__(self):
+        return '%s(%r, gain=%s)' % (self.__class__.__name__, self.source,
+                                    self.gain)
+
+    def stop(self):
+        self._mixer.remove(self)
+
+    def read(self, frame_count):
+        ''' Return up to frame_count frames in the mixer's format.
+            Fewer means the voice has finished.
+        '''
+        if self._on_start:
+            on_start, self._on_start = self._on_start, None
+            self._call(on_start)
+        source = self.source
+        if self._converter is None and not self.loop:
+            return source.read(frame_count)  # as is, a view
+
+        want = frame_count * self._frame_size
+        pending = self._pending
+        chunk_frames = int(frame_count * self._ratio) + 1
+        while len(pending) < want:
+            chunk = source.read(chunk_frames)
+            if not len(chunk):
+                if self.loop and source.frames:
+                    source.rewind()
+                    continue
+                break
+            pending += self._converter.convert(chunk) if self._converter \
+                       else chunk
+        data = bytes(pending[:want])
+        del pending[:want]
+        return data
+
+    def _finish(self):
+        self.done.set()
+        if self._on_done:
+            self._call(self._on_done)
+
+    def _call(self, callback):
+        try:
+            callback(self)
+        except Exception as err:  # audio thread, don't die
+            log.error('voice callback failed: %r', err)
+
+
+class Mixer:
+    ''' Mix any number of sounds into one persistent PortAudio stream.
 
         Arguments:
 
-            sound_file      May be a path, an alias, or bytes-like object of
-                            audio data.
-            wait            Wait to finish, or play in background & return now.
-            is_alias        Use to inform winsound that sound_file is an alias.
+            sample_rate         Stream rate, defaults to the output device's.
+            channels            Stream channel count, samples are 16-bit.
+            frames_per_buffer   Frames per callback, the start latency.
+            latency             'low', 'default', 'power-save' or a target
+                                in ms, sets frames_per_buffer instead.
+            limiter             Scale down loud mixes instead of clipping
+                                them, requires NumPy.
 
-        Notes:
-            - https://docs.python.org/3/library/winsound.html
-            - Only WAV format files are supported.
+        Voices may be WavReaders, PCMBuffers of tones or raw PCM, in any
+        format, they are converted to the stream's on the fly.
+        Starting a voice costs at most one buffer period, no device open.
     '''
-    def __init__(self, sound_file, wait=None, is_alias=None, **kwargs):
-        log.debug('initializing %s', self.__class__.__name__)
-        self._wait = kwargs.get('block', wait)  # compat with playsound
-        import winsound  # deferred
+    _shared = None
 
-        flags = 0  # figure flags
-        if is_alias:
-            log.debug('is alias: %r', sound_file)
-            flags |= winsound.SND_ALIAS
-        elif isinstance(sound_file, bytes):
-            log.debug('audio is an in-memory bytes object.')
-            flags |= winsound.SND_MEMORY
+    def __init__(self, sample_rate=None, channels=2, frames_per_buffer=512,
+                 limiter=False, latency=None):
+        from threading import Lock  # deferred
+
+        if sample_rate is None:
+            info = _pa_engine.default_output()
+            sample_rate = int(info['defaultSampleRate']) if info else 44_100
+        self.format = AudioFormat(sample_rate, channels, 2)
+        latency = _latency_ms(latency)
+        if latency is not None:
+            frames_per_buffer = _pa_frames(latency, sample_rate)
+        self.frames_per_buffer = frames_per_buffer
+        self._np = np = _numpy()
+        self._audioop = None if np else _audioop()
+        if not (np or self._audioop):
+            raise ImportError('Mixing requires NumPy, try: '
+                              'pip install --user numpy.')
+        if limiter and not np:
+            raise ImportError('The limiter requires NumPy.')
+        self._limiter = limiter
+        self._limit_gain = 1.0
+        self._acc = None
+        self._lock = Lock()
+        self._voices = ()  # replaced, not mutated; read by audio thread
+        self._pa = self._stream = None
+        self.underruns = self.overruns = 0  # PortAudio's callback flags
+
+    @classmethod
+    def shared(cls):
+        ''' Return a process-wide mixer, created on first use. '''
+        with _pa_engine._lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def active(self):
+        ''' Number of voices playing. '''
+        return len(self._voices)
+
+    @property
+    def latency_ms(self):
+        ''' Output latency PortAudio reports for the stream, once open. '''
+        stream = self._stream
+        return None if stream is None else stream.get_output_latency() * 1000
+
+    def play(self, source, gain=1.0, loop=False, on_done=None, on_start=None):
+        ''' Add a voice, playing source from its current position.
+
+            Returns a Voice, with a done event and stop() method.
+        '''
+        voice = Voice(self, source, gain=gain, loop=loop, on_done=on_done,
+                      on_start=on_start)
+        with self._lock:
+            self._voices += (voice,)
+        self.start()
+        log.debug('voice added: %r', voice)
+        return voice
+
+    def remove(self, voice):
+        ''' Remove a voice, it is marked done. '''
+        with self._lock:
+            voices = self._voices
+            self._voices = tuple(v for v in voices if v is not voice)
+            if len(self._voices) == len(voices):
+                return
+        voice._finish()
+
+    def stop(self):
+        ''' Remove all voices, the stream keeps running. '''
+        for voice in self._voices:
+            self.remove(voice)
+
+    def start(self):
+        ''' Open and start the output stream, if not already. '''
+        with self._lock:
+            if self._stream is not None:
+                return
+            from pyaudio import (paContinue, paInt16,  # deferred
+                                 paOutputOverflow, paOutputUnderflow)
+
+            self._pa_continue = paContinue
+            self._pa_underflow = paOutputUnderflow
+            self._pa_overflow = paOutputOverflow
+            self._pa = _pa_engine.acquire()
+            fmt = self.format
+            log.debug('opening mixer stream: %s', fmt)
+            self._stream = self._pa.open(
+                format=paInt16,
+                channels=fmt.channels,
+                rate=fmt.sample_rate,
+                frames_per_buffer=self.frames_per_buffer,
+                output=True,
+                stream_callback=self._callback,
+            )
+
+    def close(self):
+        ''' Stop all voices and close the stream. '''
+        self.stop()
+        with self._lock:
+            stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop_stream()
+            stream.close()
+            self._pa = None
+            _pa_engine.release()
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        if status:
+            if status & self._pa_underflow:
+                self.underruns += 1
+            if status & self._pa_overflow:
+                self.overruns += 1
+        voices = self._voices
+        want = frame_count * self.format.frame_size
+        if not voices:
+            return (bytes(want), self._pa_continue)  # silence
+
+        finished = []
+        if self._np:
+            data = self._mix_np(voices, frame_count, want, finished)
         else:
-            log.debug('audio is a filename to load: %r', sound_file)
-            flags |= winsound.SND_FILENAME
-            sound_file = self.verify_file(sound_file)
-        if not self._wait:
-            log.debug('not waiting for audio to finish.')
-            flags |= winsound.SND_ASYNC
+            data = self._mix_audioop(voices, frame_count, want, finished)
+        for voice in finished:
+            self.remove(voice)
+        return (data, self._pa_continue)
+
+    def _mix_np(self, voices, frame_count, want, finished):
+        np = self._np
+        acc = self._acc
+        if acc is None or len(acc) != want // 2:
+            self._acc = acc = np.zeros(want // 2, np.int32)
+        else:
+            acc.fill(0)
+
+        for voice in voices:
+            data = voice.read(frame_count)
+            size = len(data)
+            if size:
+                samples = np.frombuffer(data, '<i2')
+                if voice.gain == 1:
+                    acc[:size // 2] += samples
+                else:
+                    acc[:size // 2] += (samples * voice.gain).astype(np.int32)
+            if size < want:
+                finished.append(voice)
+
+        if self._limiter:  # instant attack, ~100ms release
+            peak = int(np.abs(acc).max())
+            target = min(1.0, 0x7FFF / peak) if peak else 1.0
+            gain = self._limit_gain
+            release = frame_count / self.format.sample_rate * 10
+            self._limit_gain = gain = (target if target < gain else
+                                       min(target, gain + release))
+            if gain < 1:
+                np.multiply(acc, gain, out=acc, casting='unsafe')
+        np.clip(acc, -0x8000, 0x7FFF, out=acc)
+        return acc.astype('<i2').tobytes()
+
+    def _mix_audioop(self, voices, frame_count, want, finished):
+        audioop = self._audioop
+        mixed = None
+        for voice in voices:
+            data = bytes(voice.read(frame_count))
+            if len(data) < want:
+                finished.append(voice)
+                data += bytes(want - len(data))
+            if voice.gain != 1:
+                data = audioop.mul(data, 2, voice.gain)
+            mixed = data if mixed is None else audioop.add(mixed, data, 2)
+        return mixed  # add() clips
+
+
+class PyAudioBoomBox(_BoomBoxBase):
+    ''' Play an audio file via PyAudio.
+
+        Arguments:
+
+            sound_file      Path to a WAV file, a PCMBuffer or PCMStream,
+                            or a source of PCM chunks given with format.
+            wait            Wait to finish, or play in background & return now.
+            format          AudioFormat of streamed chunks, see PCMStream.
+            cues            Map of name: (start_ms, end_ms) segments, for
+                            play(cue).  end_ms of None plays to the end.
+            mixer           A Mixer to play through, or True for the shared
+                            one.  Then play() and stop() only add and
+                            remove a voice, sounds may overlap.
+            latency         'low', 'default', 'power-save' or a target in
+                            ms, sets the stream's frames_per_buffer.
+                            Via a mixer, the mixer's applies.
+            native          Convert the sound to the output device's
+                            format, or the mixer's, once.  Files are kept
+                            converted in boombox.conversion_cache.
+                            Needs NumPy, or audioop for mono and stereo.
+            effects         An Effects, gain, pan and fades applied in
+                            the callback, adjustable while playing.
+            devices         Output devices to play to at once, by index
+                            or part of name.  The sound is loaded once,
+                            each device gets a stream and starts within
+                            a buffer of the others.  One that fails is
+                            logged and left out.  Not with a mixer.
+        Note:
+            - Sound file must be in WAV format.
+            - The PortAudio engine is shared process-wide,
+              see devices().
+            - Via a mixer, under and overruns are counted on it.
+            - The file and stream are opened on first play.
+            - https://people.csail.mit.edu/hubert/pyaudio/docs/
+    '''
+    __slots__ = ('_cursor', '_mixer', '_pa', '_pa_complete', '_pa_continue',
+                 '_pa_overflow', '_pa_underflow', '_sound_file', '_stream',
+                 '_tone', '_tone_spec', '_voices', '_wait', '_wav_file',
+                 '_native', '_devices', '_outputs', '_pending', 'cues',
+                 'effects')
+    in_memory = True
+
+    def __init__(self, sound_file, wait=None, mixer=None, format=None,
+                 cues=None, latency=None, native=False, effects=None,
+                 devices=None, **kwargs):
+        from pyaudio import (paComplete, paContinue, paOutputOverflow,
+                             paOutputUnderflow)
+
+        super().__init__(latency)
+        self._wait = kwargs.get('block', wait)  # compat with playsound
+        self._pa_continue = paContinue
+        self._pa_complete = paComplete
+        self._pa_underflow = paOutputUnderflow
+        self._pa_overflow = paOutputOverflow
+        sound_file = _as_stream(sound_file, format)
+        if not isinstance(sound_file, (PCMBuffer, PCMStream)):
+            sound_file = self._timed('verify_ms', self.verify_file,
+                                     sound_file)
+        self._sound_file = sound_file
+        self._mixer = Mixer.shared() if mixer is True else mixer
+        if devices and (self._mixer or isinstance(sound_file, PCMStream)):
+            raise ValueError('devices fan out a sound, not a mixer '
+                             'or live stream.')
+        self._devices = tuple(devices or ())
+        if native and not (_numpy() or _audioop()):
+            raise ImportError('Conversion requires NumPy, try: '
+                              'pip install --user numpy.')
+        self._native = native
+        self.cues = dict(cues or {})
+        self.effects = effects
+        self._voices = set()
+        self._outputs, self._pending = (), set()
+        self._wav_file = self._cursor = self._stream = self._tone = None
+        self._pa = None  # all on first play
+        self._initialized()
+
+    @staticmethod
+    def devices():
+        ''' Return info dictionaries of the audio devices, cached. '''
+        return _pa_engine.devices()
+
+    def _native_format(self):
+        if self._mixer:
+            return self._mixer.format
+        for device in self._devices:  # the first there is
+            try:
+                return _pa_engine.native_format(
+                    _pa_engine.output_index(device))
+            except (ValueError, IndexError):
+                continue
+        return _pa_engine.native_format()
+
+    def _busy(self):
+        if self._pending:
+            self._reap_outputs()
+        tone = self._tone  # blocking writes don't mark playback
+        return super()._busy() or (tone is not None and tone.is_active())
+
+    def _engine(self):
+        ''' Return the shared engine, acquiring it again after close. '''
+        if self._pa is None:
+            self._pa = _pa_engine.acquire()
+        return self._pa
+
+    def _setup_wav(self):
+        log.debug('setting up .wav file.')
+        old = getattr(self, '_wav_file', None)
+        if old and old is not self._sound_file:
+            old.close()
+        sound_file = self._sound_file
+        if isinstance(sound_file, PCMStream) or (
+           isinstance(sound_file, PCMBuffer) and not self._native):
+            self._wav_file = wav_file = sound_file.segment()
+        elif isinstance(sound_file, PCMBuffer):  # convert once, own copy
+            target = self._native_format()
+            self._wav_file = wav_file = PCMBuffer(convert_pcm(
+                sound_file.data, sound_file.format, target), target)
+        elif self._native:
+            self._wav_file = wav_file = conversion_cache.get(
+                sound_file, self._native_format())
+        else:
+            self._wav_file = wav_file = WavReader(sound_file)
+        self._cursor = wav_file  # what the stream reads, or a segment
+        if self._mixer:
+            return  # no stream of our own
+        fmt = wav_file.format
+        pa = self._engine()
+        if self._devices:
+            self._outputs = self._timed('open_ms', self._open_outputs, pa,
+                                        fmt)
+            return
+
+        self._stream = self._timed('open_ms', lambda: pa.open(
+            format=pa.get_format_from_width(fmt.sample_width),
+            channels=fmt.channels,
+            rate=fmt.sample_rate,
+            output=True,
+            frames_per_buffer=_pa_frames(self._latency, fmt.sample_rate),
+            start=False,
+            stream_callback = self._read_stream,
+        ))
+
+    def _open_outputs(self, pa, fmt):
+        ''' Open a stream on each device, leaving out those that fail. '''
+        frames_per_buffer = _pa_frames(self._latency, fmt.sample_rate)
+        outputs = []
+        for device in self._devices:
+            output = _DeviceOutput(self, device)
+            try:
+                output.open(pa, fmt, frames_per_buffer)
+            except (OSError, ValueError) as err:
+                log.warning('device %r left out: %r', device, err)
+                continue
+            outputs.append(output)
+        if not outputs:
+            raise OSError('none of the devices %r opened.'
+                          % (self._devices,))
+        return outputs
+
+    def _start_outputs(self, source):
+        ''' Start every device on its own cursor over the same frames.
+            All are readied first, then started back to back.
+        '''
+        outputs = self._outputs
+        for output in outputs:
+            output.ready(self._processed(source.segment()))
+        self._pending = set(outputs)
+        for output in outputs:
+            try:
+                output.stream.start_stream()
+            except OSError as err:  # unplugged? the others play on
+                log.warning('device %r failed: %r', output.device, err)
+                self._output_done(output)
+
+    def _output_done(self, output):
+        ''' A device finished, or failed.  Safe from its audio thread. '''
+        pending = self._pending
+        pending.discard(output)
+        if not pending:
+            self._playback_done()
+
+    def _reap_outputs(self):
+        ''' Count devices whose streams stopped without finishing, as a
+            failing device stops calling back.
+        '''
+        for output in tuple(self._pending):
+            if not output.stream.is_active():
+                log.warning('device %r stopped.', output.device)
+                self._output_done(output)
+
+    @property
+    def latency_ms(self):
+        ''' Output latency PortAudio reports for the stream, once open.
+            For several devices, the longest.
+        '''
+        if self._mixer:
+            return self._mixer.latency_ms
+        if self._outputs:
+            return max(output.stream.get_output_latency()
+                       for output in self._outputs) * 1000
+        stream = self._stream
+        return None if stream is None else stream.get_output_latency() * 1000
+
+    def _read_stream(self, in_data, frame_count, time_info, status):
+        if self.stats is not None:
+            self._first_buffer()
+            if status & self._pa_underflow:
+                self._count('underruns')
+            if status & self._pa_overflow:
+                self._count('overruns')
+        cursor = self._cursor
+        # PyAudio takes bytes only, copy the view here at the boundary
+        data = bytes(cursor.read(frame_count))
+        if len(data) < frame_count * cursor.format.frame_size:
+            self._playback_done()
+            return (data, self._pa_complete)
+        return (data, self._pa_continue)
+
+    def play(self, cue=None, start_ms=None, end_ms=None):
+        ''' Play the sound, or a segment of it by cue name or offsets. '''
+        log.debug('playing: %r', self._sound_file)
+        span = self._span(cue, start_ms, end_ms)
+        self._start(span)
+        if self._wait:
+            if self._outputs:  # watch for devices that stop calling back
+                while not self._ended.wait(0.1):
+                    self._reap_outputs()
+            else:
+                self._ended.wait()  # set by the callback, no polling
+        return self  # convenience
+
+    def _segment(self, span):
+        ''' Slice the loaded frames for a span, no seeking or reading. '''
+        source = self._wav_file
+        if isinstance(source, PCMStream):
+            raise ValueError('a live stream has no segments.')
+        rate = source.format.sample_rate
+        start_ms, end_ms = span
+        return source.segment(
+            int(start_ms * rate / 1000),
+            None if end_ms is None else int(end_ms * rate / 1000),
+        )
+
+    def _start(self, span=None):
+        self.handles.touch(self)
+        if self._wav_file is None:  # first play, or closed since
+            self._setup_wav()
+        self._playback_started()
+        if self._mixer:
+            return self._play_voice(self._processed(
+                self._segment(span) if span else self._wav_file.segment()))
+        if self._outputs:
+            return self._start_outputs(self._segment(span) if span else
+                                       self._wav_file)
+
+        if span:
+            self._cursor = self._processed(self._segment(span))
+        else:
+            self._wav_file.rewind()  # offset reset
+            self._cursor = self._processed(self._wav_file)
+        try:
+            if not self._stream.is_stopped():  # completed, not stopped
+                self._stream.stop_stream()
+            self._stream.start_stream()
+        except OSError:
+            log.warning('stream closed, restarting.')
+            self._setup_wav()
+            self._cursor = self._processed(self._segment(span) if span else
+                                           self._wav_file)
+            self._stream.start_stream()
+
+    def _processed(self, source):
+        ''' Read the source through the effects, if any. '''
+        if self.effects is None:
+            return source
+        return _Processed(source, self.effects)
+
+    def _play_voice(self, source):
+        ''' Add a voice to the mixer. '''
+        voice = self._mixer.play(source, on_done=self._voice_done,
+                                 on_start=self._voice_started)
+        self._voices.add(voice)
+        if voice.done.is_set():  # short and already over
+            self._voice_done(voice)
+        return voice
+
+    def _voice_started(self, voice):
+        if self.stats is not None:
+            self._first_buffer()
+
+    def _voice_done(self, voice):
+        self._voices.discard(voice)
+        if not self._voices:
+            self._playback_done()
+
+    def stop(self, close=True):
+        log.debug('stopping: %r', self._sound_file)
+        if self._mixer:
+            for voice in tuple(self._voices):
+                voice.stop()
+        elif self._stream:
+            self._stream.stop_stream()
+        for output in self._outputs:
+            output.stop()
+        self._pending = set()
+        self._playback_done()
+        if close:
+            self.close()
+
+    def close(self):
+        ''' Close the file and streams, they reopen on the next play. '''
+        log.debug('closing: %r', getattr(self, '_sound_file', None))
+        self.handles.discard(self)
+        for name in ('_stream', '_tone', '_wav_file'):
+            handle = getattr(self, name, None)
+            if handle is not None:
+                setattr(self, name, None)
+                handle.close()
+        outputs, self._outputs = getattr(self, '_outputs', ()), ()
+        for output in outputs:
+            output.close()
+        if getattr(self, '_pa', None):
+            self._pa = None
+            _pa_engine.release()
+
+    def play_tone(self, frequency_hz, duration_ms, volume=0.2,
+                  sample_rate=22050, sample_width=1):
+        ''' Generate a tone at the given frequency.
+
+            Arguments:
+
+                frequency       integer hz
+                duration        float miliseconds
+                volume          float 0…1
+                sample_rate     integer hz, ie (11_025, 22_050, 44_100, 48_000)
+                sample_width    1 for unsigned 8-bit, 2 for signed 16-bit
+
+            The sample rate should be at least double the frequency.
+        '''
+        freq = frequency_hz
+        log.debug('generating %shz for %sms', freq, duration_ms)
+        if sample_rate < (freq * 2):
+            log.warn('Warning: sample_rate must be at least double the '
+                     'frequency to accurately represent it:\n    sample_rate '
+                    f'{sample_rate} ≯ {freq*2} (frequency {freq}*2)')
+
+        data = get_tone(freq, duration_ms, volume=volume,
+                        sample_rate=sample_rate, sample_width=sample_width)
+        self._play_samples(data, sample_rate, sample_width)
+
+    def play_sequence(self, notes, volume=0.2, sample_rate=22050,
+                      sample_width=1, fade_ms=5):
+        ''' Play a sequence of tones, rendered into one buffer, with one
+            write to the tone stream.  See render_sequence.
+
+            e.g. play_sequence(dtmf('555-0123')), or a chime:
+            play_sequence([(659, 150), (523, 150), (392, 400)])
+        '''
+        data = get_sequence(notes, volume, sample_rate, sample_width, fade_ms)
+        self._play_samples(data, sample_rate, sample_width)
+
+    def _play_samples(self, data, sample_rate, sample_width):
+        ''' Play mono samples to the end, via the mixer or tone stream. '''
+        if self._mixer:
+            fmt = AudioFormat(sample_rate, 1, sample_width)
+            voice = self._mixer.play(PCMBuffer(data, fmt))
+            voice.done.wait()
+            return
+
+        stream = self._tone_stream(sample_rate, sample_width)
+        stream.start_stream()
+        stream.write(data)  # one write, exact length
+        stream.stop_stream()  # drains
+
+    def _tone_stream(self, sample_rate, sample_width):
+        ''' Open a blocking tone stream, reused while the format holds. '''
+        spec = (sample_rate, sample_width)
+        stream = getattr(self, '_tone', None)
+        if stream and self._tone_spec != spec:
+            stream.close()
+            stream = None
+        if stream is None:
+            log.debug('opening tone stream: %s hz, %s byte', *spec)
+            self.handles.touch(self)
+            pa = self._engine()
+            self._tone = stream = pa.open(
+                format=pa.get_format_from_width(sample_width,
+                                                unsigned=True),
+                channels=1,  # mono
+                rate=sample_rate,
+                output=True,
+                frames_per_buffer=_pa_frames(self._latency, sample_rate),
+                start=False,
+            )
+            self._tone_spec = spec
+        return stream
+
+    def __del__(self):
+        ''' Make sure hardware and streams closed on deletion.  '''
+        self.close()
+
+
+class _DeviceOutput:
+    ''' One device of a player fanned out to several, a stream with its
+        own cursor over the player's frames.
+    '''
+    __slots__ = ('cursor', 'device', 'stream', '_player')
 
-        log.debug('flags: %s', flags)
-        self._flags = flags
-        self._kwargs = kwargs
-        self._player = winsound
-        self._sound_file = sound_file
+    def __init__(self, player, device):
+        self.device = device
+        self.cursor = self.stream = None
+        self._player = player
 
-    def play(self):
-        log.debug('playing: %r', self._sound_file)
-        self._player.PlaySound(self._sound_file, self._flags)
-        return self  # convenience
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.device)
+
+    def open(self, pa, fmt, frames_per_buffer):
+        self.stream = pa.open(
+            format=pa.get_format_from_width(fmt.sample_width),
+            channels=fmt.channels,
+            rate=fmt.sample_rate,
+            output=True,
+            output_device_index=_pa_engine.output_index(self.device),
+            frames_per_buffer=frames_per_buffer,
+            start=False,
+            stream_callback=self._read_stream,
+        )
+
+    def ready(self, cursor):
+        ''' Stop if still going, and read from cursor when started. '''
+        self.cursor = cursor
+        try:
+            if not self.stream.is_stopped():
+                self.stream.stop_stream()
+        except OSError as err:
+            log.warning('device %r: %r', self.device, err)
 
     def stop(self):
-        log.debug('stopping: %r', self._sound_file)
-        self._player.PlaySound(None, 0)
+        try:
+            self.stream.stop_stream()
+        except OSError:
+            pass  # gone already
 
-    def play_tone(self, frequency_hz, duration_ms, **kwargs):
-        log.debug('trying winsound.Beep…')
-        self._player.Beep(frequency_hz, duration_ms)  # e.g. (1000, 500)
+    def close(self):
+        stream, self.stream = self.stream, None
+        if stream is not None:
+            stream.close()
 
+    def _read_stream(self, in_data, frame_count, time_info, status):
+        player = self._player
+        if player.stats is not None:
+            player._first_buffer()
+            if status & player._pa_underflow:
+                player._count('underruns')
+        cursor = self.cursor
+        data = bytes(cursor.read(frame_count))  # PyAudio takes bytes only
+        if len(data) < frame_count * cursor.format.frame_size:
+            player._output_done(self)
+            return (data, player._pa_complete)
+        return (data, player._pa_continue)
 
-class MacOSBoomBox(_BoomBoxBase):
-    ''' Play an audio file on MacOS via PyObjC.
 
-        Arguments:
+_NOT_READY = object()  # prefetch still decoding
 
-            sound_file      May be a path, an alias, or bytes-like object of
-                            audio data.
-            wait            Wait to finish, or play in background & return now.
 
-        Notes:
-            - pip install PyObjC
+class _PyAudioQueueOutput:
+    ''' PlaybackQueue output on one PortAudio stream.  The callback moves
+        on to the next sound within the same buffer, which a worker thread
+        has already loaded and converted to the stream's format.
     '''
-    def __init__(self, sound_file, wait=None, **kwargs):
-        log.debug('initializing %s', self.__class__.__name__)
-        self._sound_file = sound_file = self.verify_file(sound_file)
-        self._wait = kwargs.get('block', wait)  # compat with playsound
+    def __init__(self, queue, format=None, frames_per_buffer=1024,
+                 latency=None, **kwargs):
+        from concurrent.futures import ThreadPoolExecutor  # deferred
+        from pyaudio import paComplete, paContinue
 
-        self._player = NSSound.alloc()
-        self._player.initWithContentsOfFile_byReference_(sound_file, True)
+        self._queue = queue
+        self._pa_continue = paContinue
+        self._pa_complete = paComplete
+        self.format = format
+        self.frames_per_buffer = frames_per_buffer
+        self._latency = _latency_ms(latency)  # overrides, once rate known
+        self.underruns = 0
+        self._source = None
+        self._stream = None
+        self._pa = None
+        self._decoder = ThreadPoolExecutor(
+            1, thread_name_prefix='boombox-prefetch')
 
-    def play(self):
-        log.debug('playing: %r', self._sound_file)
-        self._player.play()
-        if self._wait:
-            _sleep(self._player.duration())
-        return self  # convenience
+    @staticmethod
+    def check(sound):
+        if isinstance(sound, PCMBuffer):
+            return sound
+        if isinstance(sound, PCMStream):
+            raise TypeError('a live stream has no end to queue after.')
+        return _BoomBoxBase.verify_file(sound)
 
-    def stop(self):
-        log.debug('stopping: %r', self._sound_file)
-        self._player.stop()
+    def _decode(self, sound):
+        ''' Load a sound and convert it to the stream's format. '''
+        source = sound.segment() if isinstance(sound, PCMBuffer) else \
+                 WavReader(sound)
+        target = self.format or source.format
+        if source.format == target:
+            return source
+        data = PCMConverter(source.format, target).convert(source.data)
+        source.close()
+        return PCMBuffer(data, target)
 
-    def play_tone(self, frequency_hz, duration_ms, **kwargs):
-        ''' Generate a beep tone. '''
-        msg = 'Tone generation not yet implemented on darwin.'
-        log.warning(msg)
-        raise NotImplementedError(msg)
+    def prefetch(self):
+        ''' Start decoding the next sound, if not yet. '''
+        queue = self._queue
+        with queue._lock:
+            if queue._pending and queue._pending[0][1] is None:
+                item = queue._pending[0]
+                item[1] = self._decoder.submit(self._decode, item[0])
 
+    def _take_ready(self):
+        ''' Return the next decoded sound, None at the end, or _NOT_READY.
+            Doesn't wait, runs on the audio thread.
+        '''
+        queue = self._queue
+        with queue._lock:
+            if not queue._pending:
+                queue._done()
+                return None
+            future = queue._pending[0][1]
+            if future is None or not future.done():
+                return _NOT_READY
+            queue._pending.popleft()
+        self.prefetch()  # the one after
+        try:
+            return future.result()
+        except Exception as err:
+            log.error('could not load: %r', err)
+            return self._take_ready()
 
-# ---- POSIX -----------------------------------------------------------------
-try:
-    import gi
-    gi.require_version('Gst', '1.0')  # shrug
-    from gi.repository import Gst
+    def start(self):
+        ''' Open the stream on first use, in the first sound's format,
+            else restart it.
+        '''
+        self.prefetch()
+        if self.format is None:
+            with self._queue._lock:
+                future = self._queue._pending[0][1]
+            self.format = future.result().format
+        if self._stream is None:
+            fmt = self.format
+            if self._latency is not None:
+                self.frames_per_buffer = _pa_frames(self._latency,
+                                                    fmt.sample_rate)
+            self._pa = pa = _pa_engine.acquire()
+            self._stream = pa.open(
+                format=pa.get_format_from_width(fmt.sample_width),
+                channels=fmt.channels,
+                rate=fmt.sample_rate,
+                output=True,
+                frames_per_buffer=self.frames_per_buffer,
+                start=False,
+                stream_callback=self._read_stream,
+            )
+        elif not self._stream.is_stopped():  # completed, not stopped
+            self._stream.stop_stream()
+        self._stream.start_stream()
 
-    class GstBoomBox(_BoomBoxBase):
-        ''' Play an audio file (ogg, wav, mp3, etc) via the Gstreamer system.
+    @property
+    def latency_ms(self):
+        stream = self._stream
+        return None if stream is None else stream.get_output_latency() * 1000
 
-            To wait, set wait=True.
-            To wait, limited to a maximum amount of time, use duration_ms.
-        '''
-        def __init__(self, sound_file, wait=None, duration_ms=None, **kwargs):
-            log.debug('initializing %s', self.__class__.__name__)
-            self._sound_file = sound_file = self.verify_file(sound_file)
+    def _read_stream(self, in_data, frame_count, time_info, status):
+        frame_size = self.format.frame_size
+        want = frame_count * frame_size
+        chunks, have = [], 0
+        while have < want:
+            source = self._source
+            if source is None:
+                source = self._take_ready()
+                if source is None:  # all done, now idle
+                    return (b''.join(chunks), self._pa_complete)
+                if source is _NOT_READY:  # fill in, try again next time
+                    self.underruns += 1
+                    silence = b'\x80' if self.format.sample_width == 1 \
+                              else b'\0'
+                    chunks.append(silence * (want - have))
+                    break
+                self._source = source
+            data = source.read((want - have) // frame_size)
+            chunks.append(data)
+            have += len(data)
+            if have < want:  # on to the next
+                self._source = None
+                self._queue.played += 1
+        return (b''.join(chunks), self._pa_continue)  # bytes, for PyAudio
 
-            # somebody set us up the bomb!
-            Gst.init(None)
-            playbin = Gst.ElementFactory.make('playbin', 'playbin')
-            if sound_file.startswith(('http://', 'https://')):
-                playbin.props.uri = sound_file
-            else:
-                playbin.props.uri = 'file://' + sound_file
-
-            self._wait = kwargs.get('block', wait)  # compat with playsound
-            self._duration_ms = duration_ms
-            self._gst = Gst  # constants
-            self._playing = Gst.State.PLAYING
-            self._stopped = Gst.State.NULL
-            self._EOS = Gst.MessageType.EOS  # end of stream-kowski
-            self._playbin = playbin
-
-        def _on_message(self, bus, message):
-            ''' Reset playback at end of stream. '''
-            log.debug('message1 sent.')
-            MessageType = self._gst.MessageType
-            mtype = message.type
-            if mtype == MessageType.EOS:
-                self._playbin.set_state(self._stopped)
-                log.debug('end of stream: %r', self._sound_file)
-            elif mtype == MessageType.ERROR:
-                err, debug = message.parse_error()
-                log.error('%r: %r' % (err, debug))
+    def skip(self):
+        self._source = None  # the callback takes the next
 
-        def play(self):
-            playbin = self._playbin
-            playbin.set_state(self._stopped)  # rewind
-            log.debug('playing: %r', self._sound_file)
-            result = playbin.set_state(self._playing)
-            if result != self._gst.StateChangeReturn.ASYNC:
-                raise RuntimeError('playbin.set_state returned: %r' % result)
-
-            bus = playbin.get_bus()  # listen for end
-            if self._wait:
-                if self._duration_ms:  #  convert to nanoseconds for gst
-                    log.debug('timeout is %s ms', self._duration_ms)
-                    timeout = self._duration_ms * 1_000_000
-                else:  # could hang if in wrong state
-                    log.debug('waiting for sound to end…')
-                    timeout = self._gst.CLOCK_TIME_NONE
-
-                bus.poll(self._EOS, timeout)  # wait for end
-                playbin.set_state(self._stopped)
-            else:
-                bus.add_signal_watch()
-                bus.connect('message', self._on_message)  # call back on end
+    def stop(self):
+        self._source = None
+        if self._stream:
+            self._stream.stop_stream()
 
-        def stop(self):
-            log.debug('stopping: %r', self._sound_file)
-            self._playbin.set_state(self._stopped)
+    def close(self):
+        self.stop()
+        if self._stream:
+            self._stream.close()
+            self._stream = None
+        if self._pa:
+            self._pa = None
+            _pa_engine.release()
+        self._decoder.shutdown(wait=False)
 
-        def play_tone(self, frequency_hz, duration_ms, volume=0.2,
-                      sample_rate=22050, **kwargs):
-
-            self._player = player = Gst.Pipeline.new("player")
-            source = Gst.ElementFactory.make("audiotestsrc", "source")
-            source.set_property("wave", 0)  # Audio-test-src-wave = sine (0)
-            source.set_property("freq", frequency_hz)
-            source.set_property("volume", volume)
-
-            # calculating duration is quite clumsy, not sure if correct:
-            sfactor = 44_100/sample_rate
-            num_buffers = round(duration_ms/10)  # take one zero from here
-            samples_per = round((sample_rate * sfactor)/100)  # add here
-            if self._wait:
-                est_seconds = (num_buffers * samples_per / 44_100)
-            #~ print(' * num-buffers ', num_buffers)
-            #~ print(' * samples per buffer ', samples_per)
-            #~ print('   = %2.4f secs' % est_seconds)
-            source.set_property("num-buffers", num_buffers)
-            source.set_property("samplesperbuffer", samples_per)
-
-            conv = Gst.ElementFactory.make("audioconvert", "converter")
-            sink = Gst.ElementFactory.make("autoaudiosink", "output")
-            # connect
-            player.add(source)
-            player.add(conv)
-            player.add(sink)
-            source.link(conv)
-            conv.link(sink)
-
-            bus = player.get_bus()
-            bus.add_signal_watch()
-            bus.connect("message", self._on_message2)
-
-            result = player.set_state(self._playing)
-            if result != self._gst.StateChangeReturn.ASYNC:
-                raise RuntimeError('player.set_state returned: %r' % result)
-            if self._wait:
-                _sleep(round(est_seconds + .1, 3))
-
-        def _on_message2(self, bus, message):  # doesn't run
-            log.debug('message2 sent.')
-            MessageType = self._gst.MessageType
-            mtype = message.type
-            if mtype == MessageType.EOS:
-                log.debug('end of stream.')
-                self._player.set_state(self._stopped)
-            elif mtype == MessageType.ERROR:
-                err, debug = message.parse_error()
-                log.error('%r: %r' % (err, debug))
 
-except ImportError:
-    gi = None
+# ---- Command-line players ---------------------------------------------------
+_PCM_PLAYERS = dict(  # binary: (raw stdin arguments, format by sample width)
+    pacat=(('--playback', '--raw', '--rate={rate}', '--channels={channels}',
+            '--format={format}'),
+           {1: 'u8', 2: 's16le', 3: 's24le', 4: 's32le'}),
+    aplay=(('-q', '-t', 'raw', '-r', '{rate}', '-c', '{channels}',
+            '-f', '{format}', '-'),
+           {1: 'U8', 2: 'S16_LE', 3: 'S24_3LE', 4: 'S32_LE'}),
+)
 
 
-# ---- X-Plaform -------------------------------------------------------------
-try:
-    import pyaudio
+def _search_path(binary):
+    ''' Look for an executable on the PATH and return it.  Cached per
+        value of PATH, so a changed one is searched afresh.
+    '''
+    return _search_dirs(binary, os.environ.get('PATH', ''))
 
-    class PyAudioBoomBox(_BoomBoxBase):
-        ''' Play an audio file via PyAudio.
 
-            Arguments:
+@lru_cache(maxsize=64)
+def _search_dirs(binary, path_var):
+    ''' Look for an executable in the directories of a PATH value. '''
+    result = None
+    path_dirs = path_var.split(os.pathsep)
 
-                sound_file      May be a path, an alias, or bytes-like object of
-                                audio data.
-            Note:
-                - Plays in background, no blocking support.
-                - Sound file must be in WAV format.
-                - https://people.csail.mit.edu/hubert/pyaudio/docs/
-        '''
-        def __init__(self, sound_file, wait=None, **kwargs):
-            from pyaudio import PyAudio, paContinue
+    for path in path_dirs:
+        binary_path = join(path, binary)
+        if os.path.isfile(binary_path) and os.access(binary_path, os.X_OK):
+            result = binary_path
+            break
 
-            self._wait = kwargs.get('block', wait)  # compat with playsound
-            self._PyAudio = PyAudio
-            self._pa_continue = paContinue
-            self._sound_file = self.verify_file(sound_file)
+    log.debug('binary_path: %r', result)
+    return result
 
-            log.debug('setting up PyAudio.')
-            with open(os.devnull, 'w') as devnull:  # hide diag on stderr :-/
-                orig_stdout_fno = os.dup(sys.stderr.fileno())
-                os.dup2(devnull.fileno(), 2)
-                self._pa = self._PyAudio()  # <-- lots of output here :-(
-                os.dup2(orig_stdout_fno, 2)
 
-            self._setup_wav()
+_LATENCY_ARGS = dict(  # binary: option setting its buffer size
+    paplay='--latency-msec={ms}',
+    pacat='--latency-msec={ms}',
+    aplay='--buffer-time={us}',
+)
 
-        def _setup_wav(self):
-            log.debug('setting up .wav file.')
-            import wave
-            self._wav_file = wav_file = wave.open(self._sound_file, 'rb')
 
-            self._stream = self._pa.open(
-                format=self._pa.get_format_from_width(wav_file.getsampwidth()),
-                channels=wav_file.getnchannels(),
-                rate=wav_file.getframerate(),
-                output=True,
-                start=False,
-                stream_callback = self._read_stream,
-            )
+def _latency_args(binary_path, latency_ms):
+    ''' Return the options asking a known player for a latency target. '''
+    if latency_ms is None:
+        return ()
+    name = os.path.splitext(os.path.basename(binary_path))[0]
+    option = _LATENCY_ARGS.get(name)
+    if option is None:
+        log.debug('no latency option known for: %r', binary_path)
+        return ()
+    return (option.format(ms=int(latency_ms), us=int(latency_ms * 1000)),)
 
-        def _read_stream(self, in_data, frame_count, time_info, status):
-            data = self._wav_file.readframes(frame_count)
-            return (data, self._pa_continue)
 
-        def play(self):
-            log.debug('playing: %r', self._sound_file)
-            self._wav_file.rewind()
-            try:
-                self._stream.start_stream()
-            except OSError:
-                log.warning('stream closed, restarting.')
-                self._setup_wav()
-                self._stream.start_stream()
-
-            if self._wait:
-                from time import sleep
-                while self._stream.is_active():
-                    sleep(0.2)
-            return self  # convenience
-
-        def stop(self, close=True):
-            log.debug('stopping: %r', self._sound_file)
-            self._stream.stop_stream()
-            if close:
-                self.close()
+def _pcm_command(binary_path, format, latency_ms=None):
+    ''' Build the command line for a player reading raw PCM on stdin. '''
+    name = os.path.splitext(os.path.basename(binary_path))[0]
+    try:
+        args, formats = _PCM_PLAYERS[name]
+    except KeyError:
+        raise ValueError('unknown raw PCM player: %r, need one of: %s'
+                         % (binary_path, ', '.join(_PCM_PLAYERS)))
+    if format.sample_width not in formats:
+        raise ValueError('unsupported sample width: %s' % format.sample_width)
+    fields = dict(rate=format.sample_rate, channels=format.channels,
+                  format=formats[format.sample_width])
+    return ((binary_path,) + _latency_args(binary_path, latency_ms)
+            + tuple(arg.format(**fields) for arg in args))
 
-        def close(self):
-            log.debug('closing: %r', self._sound_file)
-            try:
-                self._wav_file.close()
-                self._stream.close()
-                self._pa.terminate()
-            except AttributeError:
-                pass
 
-        def play_tone(self, frequency_hz, duration_ms, volume=0.2,
-                      sample_rate=22050):
-            ''' Generate a tone at the given frequency.
+class _PlayerDaemon:
+    ''' A long-lived command-line player, fed raw PCM through its stdin.
 
-                Arguments:
+        One per command line, i.e. per output format.  Sounds queue up and
+        are written in turn by a feeder thread, paced by the clock.
+        The child is started on first write, and again if it has died.
+    '''
+    CHUNK_SECONDS = .05
 
-                    frequency       integer hz
-                    duration        float miliseconds
-                    volume          float 0…1
-                    sample_rate     integer hz, ie (11_025, 22_050, 44_100, 48_000)
+    def __init__(self, args):
+        from collections import deque  # deferred
+        from subprocess import DEVNULL, PIPE, Popen
+        from threading import Condition, Thread
 
-                Limited to unsigned 8-bit samples at a given sample_rate.
-                The sample rate should be at least double the frequency.
-            '''
-            from math import sin, tau
+        self.args = args
+        self.child = None
+        self.restarts = 0
+        self._popen = lambda: Popen(args, stdin=PIPE, stdout=DEVNULL)
+        self._queue = deque()  # (box, PCMBuffer)
+        self._current = None
+        self._cond = Condition()
+        self._thread = Thread(target=self._run, daemon=True,
+                              name='boombox-%s' % os.path.basename(args[0]))
+        self._thread.start()
 
-            freq = frequency_hz
-            duration = duration_ms/1000
-            log.debug('generating %shz for %ss', freq, duration)
-            if sample_rate < (freq * 2):
-                log.warn('Warning: sample_rate must be at least double the '
-                         'frequency to accurately represent it:\n    sample_rate '
-                        f'{sample_rate} ≯ {freq*2} (frequency {freq}*2)')
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, ' '.join(self.args))
 
-            num_samples = int(sample_rate * duration)
-            rest_frames = num_samples % sample_rate
+    def submit(self, box, source):
+        with self._cond:
+            self._queue.append((box, source))
+            self._cond.notify()
 
-            stream = self._pa.open(
-                format=pyaudio.paUInt8,
-                channels=1,  # mono
-                rate=sample_rate,
-                output=True,
-            )
-            # make samples
-            sample = lambda i: volume * sin(tau * freq * i / sample_rate)
-            samples = (int(sample(i) * 0x7F + 0x80) for i in range(num_samples))
+    def cancel(self, box):
+        ''' Drop queued sounds of box, and cut it off if playing now. '''
+        with self._cond:
+            for item in [item for item in self._queue if item[0] is box]:
+                self._queue.remove(item)
+            if self._current is box:
+                self._current = None
+                self._kill()  # flush what's buffered, restarted on next use
+            self._cond.notify_all()
 
-            # write several samples at a time, more efficient than it looks
-            for buf in zip( *([samples] * sample_rate) ):
-                stream.write(bytes(buf))
+    def close(self):
+        with self._cond:
+            self._queue.clear()
+            self._current = None
+            child, self.child = self.child, None
+            self._cond.notify_all()
+        if child:
+            try:
+                child.stdin.close()
+                child.wait(1)
+            except Exception:  # broken pipe, timeout, whatever
+                child.kill()
 
-            # fill remainder of frameset with silence
-            stream.write(b'\x80' * rest_frames)
+    def _kill(self):
+        child, self.child = self.child, None
+        if child:
+            log.debug('killing player: %s', child.pid)
+            child.kill()
+            child.wait()
 
-            stream.stop_stream()
-            stream.close()
+    def _write(self, data):
+        ''' Write to the child, (re)starting it as needed.  Retries once. '''
+        for attempt in (1, 2):
+            child = self.child
+            if child is None or child.poll() is not None:
+                if child is not None:
+                    log.warning('player exited (%s), restarting: %r',
+                                child.returncode, self.args[0])
+                    self.restarts += 1
+                self.child = child = self._popen()
+                log.debug('started player: %s %r', child.pid, self.args)
+            try:
+                child.stdin.write(data)
+                child.stdin.flush()
+                return
+            except (BrokenPipeError, ValueError):  # died, or was killed
+                if attempt == 2:
+                    raise
+                self.child = None if self.child is child else self.child
+                self.restarts += 1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                box, source = self._queue.popleft()
+                self._current = box
+            error = None
+            try:
+                self._feed(box, source)
+            except OSError as err:
+                log.error('player failed: %s', err)
+                error = err
+            with self._cond:
+                stopped = self._current is not box
+                self._current = None
+            if not stopped:
+                box.failed = bool(error)
+                box._playback_done(error)
+
+    def _feed(self, box, source):
+        ''' Write source out in chunks, then wait out its playing time. '''
+        rate = source.format.sample_rate
+        chunk = max(1, int(rate * self.CHUNK_SECONDS))
+        ends = monotonic() + source.frames / rate
+        while True:
+            data = source.read(chunk)
+            if not data:
+                break
+            with self._cond:
+                if self._current is not box:
+                    return
+                self._write(data)
+        with self._cond:  # woken early by cancel()
+            while self._current is box and monotonic() < ends:
+                self._cond.wait(ends - monotonic())
 
-        def __del__(self):
-            ''' Make sure hardware and streams closed on deletion.  '''
-            self.close()
 
-except ImportError:
-    pyaudio = None
-    _pa_msg = 'Tone generation not available, try: pip install --user PyAudio.'
+_player_daemons = {}  # args: _PlayerDaemon
+
+
+@atexit.register
+def _close_player_daemons():
+    for daemon in tuple(_player_daemons.values()):
+        daemon.close()
+    _player_daemons.clear()
 
 
 class ChildBoomBox(_BoomBoxBase):
     ''' Play an audio file with an arbitrary command-line player.
 
-        Returns an OS process status code.
+        Arguments:
+
+            sound_file      Path to the file.
+            wait            Wait to finish, or play in background & return now.
+            binary_path     Path to a command-line player, else found on PATH.
+            daemon          Stream to one long-lived player per format,
+                            instead of starting a process per play.
+                            Needs pacat or aplay, and WAV files.
+            latency         'low', 'default', 'power-save' or a target in
+                            ms, passed on to paplay, pacat or aplay.
+
+        Sets failed from the OS process status code.
     '''
-    def __init__(self, sound_file, wait=None, binary_path=None, **kwargs):
+    __slots__ = ('_Popen', '_args', '_child', '_daemon', '_sound_file',
+                 '_source', '_wait', 'failed')
+
+    def __init__(self, sound_file, wait=None, binary_path=None, daemon=False,
+                 latency=None, **kwargs):
         from subprocess import Popen  # deferred
 
-        self._sound_file = sound_file = self.verify_file(sound_file)
+        super().__init__(latency)
+        self._sound_file = sound_file = self._timed(
+            'verify_ms', self.verify_file, sound_file)
         self._Popen = Popen
         self._wait = kwargs.get('block', wait)  # compat with playsound
         self.failed = None
+        self._daemon = None
+        if daemon:
+            self._setup_daemon(binary_path)
+            self._initialized()
+            return
+
         args = []
-        if not binary_path:  # find a platform default
+        if binary_path:
+            args.append(binary_path)
+            args.extend(_latency_args(binary_path, self._latency))
+            args.append(sound_file)
+        else:  # find a platform default
             err_msg = 'CLI player not found, set binary_path parameter.'
             if os.name == 'nt':             # I'm a PC
                 args.extend(
@@ -433,89 +3959,771 @@ class ChildBoomBox(_BoomBoxBase):
                     f'{sound_file!r}).PlaySync()')
                 )
             elif sys.platform == 'darwin':  # Think different
-                path = self._search_path('afplay')
+                path = _search_path('afplay')
                 if not path:
                     raise RuntimeError(err_msg)
+                args.append(path)
                 args.append(sound_file)
             elif os.name == 'posix':        # Tron leotards
-                path = self._search_path('paplay')
+                path = _search_path('paplay')
                 if not path:
-                    path = self._search_path('aplay')  # try again
+                    path = _search_path('aplay')  # try again
                 if not path:
                     raise RuntimeError(err_msg)
                 args.append(path)
+                args.extend(_latency_args(path, self._latency))
                 args.append(sound_file)
 
         self._args = args = tuple(args)
         log.debug('command-line: %r', args)
+        self._initialized()
+
+    def _setup_daemon(self, binary_path):
+        ''' Find or start the shared player for this file's format. '''
+        if not binary_path:
+            binary_path = _search_path('pacat') or _search_path('aplay')
+            if not binary_path:
+                raise RuntimeError('daemon mode needs pacat or aplay.')
+        self._source = source = WavReader(self._sound_file)
+        self._args = args = _pcm_command(binary_path, source.format,
+                                         self._latency)
+        log.debug('command-line: %r', args)
+
+        daemon = _player_daemons.get(args)
+        if daemon is None:
+            daemon = _player_daemons.setdefault(args, _PlayerDaemon(args))
+        self._daemon = daemon
 
     def play(self):
         log.debug('playing: %r', self._sound_file)
-        # args as list, not sure why this works w/o shell:
-        self._child = self._Popen(self._args)
+        self._start()
         if self._wait:
-            returncode = self._child.wait()
-            log.debug('%s returned: %s', self._child, returncode)
+            self._ended.wait()  # set by the daemon, or the watcher
+        return self  # convenience
+
+    def _start(self):
+        from threading import Thread  # deferred
+
+        self._playback_started()
+        if self._daemon:
+            self._daemon.submit(self, self._source.segment())
+            return
+        # args as list, not sure why this works w/o shell:
+        self._child = child = self._timed('spawn_ms', self._Popen,
+                                          self._args)
+        Thread(target=self._watch, args=(child,), daemon=True).start()
+
+    def _watch(self, child):
+        ''' Wait for the child to exit, then signal the end, unless a
+            newer play has replaced it.
+        '''
+        returncode = child.wait()
+        log.debug('%s returned: %s', child, returncode)
+        if child is self._child and not self._ended.is_set():  # stopped?
             self.failed = bool(returncode)
+            self._playback_done()
+
+    async def play_async(self):
+        ''' Run the player as an asyncio subprocess and await its exit. '''
+        import asyncio  # deferred
+
+        if self._daemon:
+            return await super().play_async()
+        log.debug('playing: %r', self._sound_file)
+        self._playback_started()
+        start = perf_counter()
+        self._child = child = await asyncio.create_subprocess_exec(
+            *self._args)
+        if self.stats is not None:
+            self._record('spawn_ms', (perf_counter() - start) * 1000)
+        returncode = await child.wait()
+        log.debug('%s returned: %s', child, returncode)
+        self.failed = bool(returncode)
+        self._playback_done()
         return self  # convenience
 
     def stop(self):
         log.debug('stopping: %r', self._sound_file)
-        self._child.terminate()
-
-    def _search_path(self, binary):
-        ''' Look for an executable on the PATH and return it. '''
-        result = None
-        path_dirs = os.environ.get('PATH', '').split(os.pathsep)
-
-        for path in path_dirs:
-            binary_path = join(path, binary)
-            binary_path_exists = exists(binary_path)
-            if binary_path_exists:
-                result = binary_path
-                break
+        if self._daemon:
+            self._daemon.cancel(self)
+        else:
+            try:
+                self._child.terminate()
+            except ProcessLookupError:  # already gone
+                pass
+        self._playback_done()
+
+
+# ---- Queues -----------------------------------------------------------------
+class PlaybackQueue:
+    ''' Play a sequence of sounds back to back, without gaps, on one
+        stream or pipeline that stays open between them.
 
-        log.debug('binary_path: %r', result)
-        return result
+        Arguments:
+
+            backend         'gstreamer' or 'pyaudio', None for the first
+                            available.
+            format          PyAudio: the stream's AudioFormat, by default
+                            that of the first sound.  Others are converted.
+
+        Other keyword arguments go to the output, e.g. audio_sink for
+        Gstreamer, frames_per_buffer for PyAudio, or latency for either.
+
+        The next sound is loaded while the current one plays.
+        enqueue() starts playing when idle, skip() jumps ahead,
+        clear() drops the rest, wait() blocks until all have played.
+    '''
+    _outputs = dict(gstreamer=_GstQueueOutput, pyaudio=_PyAudioQueueOutput)
+
+    def __init__(self, backend=None, format=None, **kwargs):
+        from collections import deque  # deferred
+        from threading import Event, RLock
+
+        if backend is None:
+            backend = next((name for name in self._outputs
+                            if _available(name)), None)
+            if backend is None:
+                raise ImportError('PlaybackQueue needs Gstreamer or PyAudio.')
+        elif backend not in self._outputs:
+            raise ValueError('gapless playback needs one of: %s'
+                             % ', '.join(self._outputs))
+        self.backend = backend
+        self.played = 0
+        self._pending = deque()  # [sound, prefetched], …
+        self._lock = RLock()
+        self._idle = Event()
+        self._idle.set()
+        self._output = self._outputs[backend](self, format=format, **kwargs)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __repr__(self):
+        return '%s(%s, %s pending, %s played)' % (
+            self.__class__.__name__, self.backend, len(self), self.played)
+
+    @property
+    def idle(self):
+        return self._idle.is_set()
+
+    def enqueue(self, *sounds):
+        ''' Add sounds, paths or PCMBuffers, and play if idle. '''
+        items = [[self._output.check(sound), None] for sound in sounds]
+        with self._lock:
+            self._pending.extend(items)
+            start = self._idle.is_set() and self._pending
+            if start:
+                self._idle.clear()
+        self._output.prefetch()
+        if start:
+            self._output.start()
+        return self  # convenience
+
+    @property
+    def latency_ms(self):
+        ''' Output latency the backend reports, once playing. '''
+        return self._output.latency_ms
+
+    def skip(self):
+        ''' Cut the current sound short, go on to the next. '''
+        if not self._idle.is_set():
+            self._output.skip()
+
+    def clear(self):
+        ''' Drop the sounds not yet started. '''
+        with self._lock:
+            self._pending.clear()
+
+    def stop(self):
+        self.clear()
+        self._output.stop()
+        self._done()
+
+    def wait(self, timeout=None):
+        ''' Block until the queue has played out, returns False on timeout.
+        '''
+        return self._idle.wait(timeout)
+
+    def close(self):
+        self.stop()
+        self._output.close()
+
+    def _take(self, idle=False):
+        ''' Pop the next sound for the output, or None, then going idle if
+            asked.  Atomic with enqueue(), so nothing is left stranded.
+        '''
+        with self._lock:
+            if self._pending:
+                return self._pending.popleft()[0]
+            if idle:
+                self._done()
+            return None
+
+    def _done(self):
+        log.debug('queue idle, %s played.', self.played)
+        self._idle.set()
+
+
+# ---- Scheduling -------------------------------------------------------------
+def _sound_player(cls, bank, sound, kwargs):
+    ''' Return a key and a maker of a player, for a SoundBank name, a
+        path, or a PCMBuffer.  A changed bank entry gets a new key.
+    '''
+    if bank is not None and isinstance(sound, str) and sound in bank:
+        if cls.in_memory:
+            buffer = bank.get(sound)  # reloaded if changed
+            return ('sound', sound, id(buffer)), lambda: cls(buffer, **kwargs)
+        path = bank._paths[sound]
+        return ('sound', sound, None), lambda: cls(path, **kwargs)
+    return ('sound', sound, None), lambda: cls(sound, **kwargs)
+
+
+class _Slot:
+    ''' A sound's player, and what a Scheduler knows of it. '''
+    __slots__ = ('player', 'priority', 'started', 'tokens', 'stamp')
+
+    def __init__(self, player, tokens, stamp):
+        self.player = player
+        self.priority = 0
+        self.started = None  # of the last play, for coalescing
+        self.tokens = tokens  # rate limit bucket, None full
+        self.stamp = stamp
+
+
+class Scheduler:
+    ''' Play sounds on demand with the load bounded, however fast they're
+        asked for, e.g. alerts during an incident.  Players are made once
+        per sound and kept.
+
+        Arguments:
+
+            backend         As select_backend(), which it calls.
+            max_voices      Most sounds playing at once.  Past it, a new
+                            sound stops the lowest priority one, oldest
+                            first, if lower than its own, else is dropped.
+            window_ms       A sound asked for again this soon after it
+                            started is coalesced into that play.
+            rate_limit      Most plays per second of any one sound, with
+                            bursts of as many.  None for no limit.
+            priorities      Map of sound: priority, when play() isn't
+                            given one.  0 otherwise, higher wins.
+            limits          Map of sound: plays per second, overriding
+                            rate_limit.
+            bank            A SoundBank, or its source, for named sounds.
+            max_players     Players kept, those idle longest go first.
+
+        Other keyword arguments go to the players, e.g. mixer or latency.
+        play() doesn't wait.  Counters are in stats().
+    '''
+    counters = ('requests', 'played', 'coalesced', 'limited', 'dropped',
+                'stolen', 'errors')
+
+    def __init__(self, backend=None, max_voices=8, window_ms=100,
+                 rate_limit=None, priorities=None, limits=None, bank=None,
+                 max_players=64, **kwargs):
+        from collections import OrderedDict  # deferred
+        from threading import Lock
+
+        self._cls = select_backend(backend)
+        kwargs['wait'] = False
+        self._kwargs = kwargs
+        if bank is not None and not isinstance(bank, SoundBank):
+            bank = SoundBank(bank)
+        self.bank = bank
+        self.max_voices = max_voices
+        self.window_ms = window_ms
+        self.rate_limit = rate_limit
+        self.priorities = dict(priorities or {})
+        self.limits = dict(limits or {})
+        self.max_players = max_players
+        self._slots = OrderedDict()  # key: _Slot, least recent first
+        self._playing = {}  # key: _Slot
+        self._lock = Lock()
+        self._counts = dict.fromkeys(self.counters, 0)
+
+    def __repr__(self):
+        return '%s(%s, %s/%s voices)' % (
+            self.__class__.__name__, self._cls.__name__, len(self._playing),
+            self.max_voices)
+
+    def play(self, sound, priority=None):
+        ''' Play a sound, a bank name, path or PCMBuffer, unless
+            coalesced, limited or dropped.  Returns its player, or None
+            when not played.
+        '''
+        key, make = _sound_player(self._cls, self.bank, sound, self._kwargs)
+        if priority is None:
+            priority = self.priorities.get(sound, 0)
+        now = monotonic()
+        counts = self._counts
+        with self._lock:
+            counts['requests'] += 1
+            slot = self._slot(key, make, now)
+            if slot.started is not None and \
+               (now - slot.started) * 1000 < self.window_ms:
+                counts['coalesced'] += 1
+                return slot.player
+            if not self._take_token(slot, sound, now):
+                counts['limited'] += 1
+                return None
+            victim = None
+            restart = key in self._playing  # its voice is stopped first
+            if not restart:
+                self._reap()
+                if len(self._playing) >= self.max_voices:
+                    victim_key, victim = min(
+                        self._playing.items(),
+                        key=lambda item: (item[1].priority, item[1].started))
+                    if victim.priority >= priority:
+                        counts['dropped'] += 1
+                        return None
+                    counts['stolen'] += 1
+                    del self._playing[victim_key]
+                    victim.started = None
+            slot.priority, slot.started = priority, now
+            self._playing[key] = slot
+            counts['played'] += 1
+
+        if victim is not None:
+            log.debug('stealing: %r', victim.player)
+            victim.player.stop()
+        if restart:  # one voice per sound, not another on top
+            slot.player.stop()
+        try:
+            slot.player.play()
+        except Exception:
+            with self._lock:
+                counts['errors'] += 1
+                self._playing.pop(key, None)
+                slot.started = None
+            raise
+        return slot.player
+
+    def stop(self):
+        ''' Stop all sounds playing. '''
+        with self._lock:
+            playing = list(self._playing.values())
+            self._playing.clear()
+        for slot in playing:
+            slot.started = None
+            slot.player.stop()
+
+    close = stop
+
+    def stats(self):
+        ''' Return the counters, voices playing and players kept. '''
+        with self._lock:
+            self._reap()
+            return dict(self._counts, voices=len(self._playing),
+                        players=len(self._slots))
+
+    def _slot(self, key, make, now):  # lock held
+        ''' Return the slot for key, making its player if new. '''
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._slots.move_to_end(key)
+            return slot
+        self._slots[key] = slot = _Slot(make(), None, now)
+        if len(self._slots) > self.max_players:
+            for old_key in list(self._slots):
+                if old_key != key and old_key not in self._playing:
+                    del self._slots[old_key]
+                    break
+        return slot
+
+    def _take_token(self, slot, sound, now):  # lock held
+        ''' Refill the sound's bucket for the time since, take one. '''
+        rate = self.limits.get(sound, self.rate_limit)
+        if rate is None:
+            return True
+        burst = max(1.0, rate)
+        tokens = slot.tokens if slot.tokens is not None else burst
+        tokens = min(burst, tokens + (now - slot.stamp) * rate)
+        slot.stamp = now
+        if tokens < 1:
+            slot.tokens = tokens
+            return False
+        slot.tokens = tokens - 1
+        return True
+
+    def _reap(self):  # lock held
+        ''' Forget the voices that have finished. '''
+        for key in [key for key, slot in self._playing.items()
+                    if slot.player._ended.is_set()]:
+            del self._playing[key]
 
 
 # ----------------------------------------------------------------------------
+# Backend registry, probed on first use, not at import
+_backends = dict(  # name: (class, modules needed)
+    winsound=(WinBoomBox, ('winsound',)),
+    appkit=(MacOSBoomBox, ('AppKit',)),
+    gstreamer=(GstBoomBox, ('gi',)),
+    pyaudio=(PyAudioBoomBox, ('pyaudio',)),
+    child=(ChildBoomBox, ()),
+)
+_optional = dict(GstBoomBox='gstreamer', PyAudioBoomBox='pyaudio')
+del GstBoomBox, PyAudioBoomBox  # via __getattr__, when installed
+_selected = None
+
 # Assign a default Player
 if os.name == 'nt':             # I'm a PC
     _example_file = 'c:/Windows/Media/Alarm08.wav'
-    BoomBox = WinBoomBox
-    #~ BoomBox = ChildBoomBox  # powershell
+    _defaults = ('winsound',)
+    #~ _defaults = ('child',)  # powershell
 
 elif sys.platform == 'darwin':  # Think different
     _example_file = '/System/Library/Sounds/Ping.aiff'
-    try:
-        log.debug('trying AppKit.NSSound…')
-        from AppKit import NSSound
-        BoomBox = MacOSBoomBox
-    except ImportError:
-        log.debug('AppKit not available, falling back to subprocess…')
-        BoomBox = ChildBoomBox
+    _defaults = ('appkit', 'child')
 
-elif os.name == 'posix':        # Tron leotards
+else:                           # Tron leotards
     _example_file = '/usr/share/sounds/sound-icons/guitar-12.wav'
+    _defaults = ('gstreamer', 'pyaudio', 'child')
+
+
+@lru_cache(maxsize=None)
+def _available(name):
+    ''' Check whether a backend's modules are installed, without importing
+        them, bar gi to ask for the Gst typelib.  Cached.
+    '''
+    from importlib.util import find_spec  # deferred
+
     try:
-        log.debug('trying gstreamer…')
-        import gi
-        gi.require_version('Gst', '1.0')  # shrug
-        BoomBox = GstBoomBox
-    except ImportError:
-        log.debug('python3-gi not available, trying pyaudio…')
+        if not all(find_spec(module) for module in _backends[name][1]):
+            return False
+        if name == 'gstreamer':  # PyGObject without the Gst typelib?
+            import gi  # deferred, cheap next to Gst itself
+
+            gi.require_version('Gst', '1.0')
+        return True
+    except (ImportError, ValueError):
+        return False
+
+
+def backends():
+    ''' Return the names of backends installed here, in platform order. '''
+    names = _defaults + tuple(name for name in _backends
+                              if name not in _defaults)
+    return tuple(name for name in names if _available(name))
+
+
+def select_backend(name=None):
+    ''' Choose the class that BoomBox refers to, and return it.
+
+        Arguments:
+
+            name            One of backends(), or None for the first
+                            available in platform order.
+    '''
+    global _selected
+
+    if name is None:
+        name = next(name for name in _defaults + ('child',)
+                    if _available(name))
+        log.debug('selected backend: %s', name)
+    elif name not in _backends:
+        raise ValueError('unknown backend: %r' % name)
+    elif not _available(name):
+        raise ImportError('backend %r is not installed.' % name)
+
+    _selected = _backends[name][0]
+    return _selected
+
+
+def __getattr__(name):
+    ''' Resolve BoomBox and the optional players lazily. '''
+    if name == 'BoomBox':
+        return _selected or select_backend()
+    backend = _optional.get(name)
+    if backend:
+        if _available(backend):
+            return _backends[backend][0]
+        raise AttributeError('%s is not available, is %s installed?'
+                             % (name, _backends[backend][1][0]))
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+# ---- Server -----------------------------------------------------------------
+def _socket_path():
+    ''' The default server address, private to the user. '''
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return join(runtime_dir, 'boombox.sock')
+    import tempfile  # deferred
+
+    return join(tempfile.gettempdir(), 'boombox-%s.sock' % os.getuid())
+
+
+def request(*words, path=None, reply=False, timeout=2.0):
+    ''' Send a request to a PlayerServer, e.g. request('play', 'chime').
+
+        Arguments:
+
+            words           The request, see PlayerServer.
+            path            The server's socket, by default the usual one.
+            reply           Wait for the answer and return it, else
+                            return at once without one.
+            timeout         Seconds to wait for the answer.
+    '''
+    import socket  # deferred
+
+    message = ' '.join(
+        _quote(word) if not word or set(word) & set(' \t\n\'"\\#') else word
+        for word in map(str, words)
+    ).encode('utf8')
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    bound_dir = None
+    try:
+        if reply:  # give the server somewhere to answer
+            if sys.platform.startswith('linux'):
+                sock.bind('')  # autobind, an abstract address
+            else:
+                import tempfile  # deferred
+
+                bound_dir = tempfile.mkdtemp(prefix='boombox-')  # 0700
+                sock.bind(os.path.join(bound_dir, 'reply.sock'))
+            sock.settimeout(timeout)
+        sock.sendto(message, path or _socket_path())
+        if reply:
+            return sock.recv(65_536).decode('utf8')
+    finally:
+        sock.close()
+        if bound_dir:
+            import shutil  # deferred
+
+            shutil.rmtree(bound_dir, ignore_errors=True)
+
+
+def _quote(word):
+    from shlex import quote  # deferred, rarely needed
+
+    return quote(word)
+
+
+class PlayerServer:
+    ''' Play sounds for other processes, keeping a backend and its device
+        warm, so a script needn't import, probe and open one to play a
+        chime.  Requests are datagrams on a Unix socket, one each,
+        in words split as by a shell:
+
+            play NAME           A SoundBank entry, else a file path.
+            tone HZ MS [VOL]    A sine tone.
+            stop [NAME]         One sound, or all of them.
+            stats               Metrics, as JSON.
+
+        A sender with a bound address gets an answer: ok, error: …,
+        or the JSON.  Others, e.g. request() by default, get none and
+        needn't wait.  Requests are handled concurrently, by a pool of
+        threads, and players kept for the next time.
+
+        Arguments:
+
+            path            Socket path, by default boombox.sock in
+                            $XDG_RUNTIME_DIR.
+            backend         As select_backend(), which it calls.
+            bank            A SoundBank, or its source, for named sounds.
+            max_workers     Requests handled at once.
+            max_players     Players kept, least recently used go first.
+
+        Other keyword arguments go to the players, e.g. binary_path.
+        PyAudio plays through the shared Mixer, Gstreamer prerolls.
+    '''
+    commands = ('play', 'tone', 'stop', 'stats')
+
+    def __init__(self, path=None, backend=None, bank=None, max_workers=8,
+                 max_players=256, **kwargs):
+        import socket  # deferred
+        from collections import OrderedDict
+        from concurrent.futures import ThreadPoolExecutor
+        from threading import Lock
+
+        self._cls = cls = select_backend(backend)
+        if cls is _backends['pyaudio'][0]:
+            kwargs.setdefault('mixer', True)
+            Mixer.shared().start()  # the device, open from now on
+        elif cls is _backends['gstreamer'][0]:
+            kwargs.setdefault('preroll', True)
+        kwargs['wait'] = False
+        self._kwargs = kwargs
+        if bank is not None and not isinstance(bank, SoundBank):
+            bank = SoundBank(bank)
+        self.bank = bank
+        self.max_players = max_players
+        self._players = OrderedDict()  # key: player
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='boombox-server')
+        self._started = monotonic()
+        self._metrics = dict.fromkeys(self.commands + ('requests', 'errors',
+                                                       'in_flight'), 0)
+        self._handle_ms = self._max_ms = 0.0
+        self._closed = False
+
+        self.path = path = path or _socket_path()
+        self._sock = sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        if os.path.exists(path):  # stale, or someone's home?
+            try:
+                sock.connect(path)
+            except ConnectionRefusedError:
+                os.unlink(path)
+            else:
+                sock.close()
+                raise RuntimeError('already serving at: %r' % path)
+        umask = os.umask(0o177)  # for our eyes only
         try:
-            import pyaudio;  pyaudio  # pyflakes
-            BoomBox = PyAudioBoomBox
-        except ImportError:
-            log.debug('pyaudio not available, falling back to subprocess…')
-            BoomBox = ChildBoomBox
+            sock.bind(path)
+        finally:
+            os.umask(umask)
+        log.info('serving at: %r with %s', path, cls.__name__)
+
+    def __repr__(self):
+        return '%s(%r, %s)' % (self.__class__.__name__, self.path,
+                               self._cls.__name__)
+
+    def serve_forever(self):
+        ''' Take requests until closed. '''
+        recvfrom, submit = self._sock.recvfrom, self._executor.submit
+        while not self._closed:
+            try:
+                data, address = recvfrom(65_536)
+            except OSError:
+                break  # closed
+            if data:
+                received = perf_counter()
+                with self._lock:
+                    self._metrics['in_flight'] += 1
+                submit(self._handle, data, address, received)
+
+    def stats(self):
+        ''' Return the server's metrics, as a dict. '''
+        with self._lock:
+            metrics = dict(self._metrics)
+            handled = metrics['requests']
+            metrics.update(
+                backend=self._cls.__name__,
+                uptime_s=round(monotonic() - self._started, 3),
+                handle_ms=round(self._handle_ms / handled, 3) if handled
+                          else None,
+                handle_max_ms=round(self._max_ms, 3),
+                players=len(self._players),
+            )
+        metrics['handles_open'] = len(self._cls.handles)
+        if self._kwargs.get('mixer') is True:
+            mixer = Mixer.shared()
+            metrics.update(voices=mixer.active, underruns=mixer.underruns)
+        if self.bank is not None:
+            metrics['bank'] = self.bank.stats()
+        return metrics
+
+    def close(self):
+        ''' Stop taking requests, stop the sounds. '''
+        if self._closed:
+            return
+        self._closed = True
+        try:  # wake the receiving thread
+            self._sock.sendto(b'', self.path)
+        except OSError:
+            pass
+        self._sock.close()
+        self._executor.shutdown(wait=True)
+        self._stop()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _handle(self, data, address, received):
+        ''' Run one request, answer if the sender can hear it. '''
+        import shlex  # deferred
+
+        command = None
+        try:
+            words = shlex.split(data.decode('utf8'))
+            command = words[0] if words else ''
+            if command not in self.commands:
+                raise ValueError('unknown request: %r' % command)
+            answer = getattr(self, '_' + command)(*words[1:]) or 'ok'
+        except Exception as err:
+            log.error('request %r failed: %r', data, err)
+            answer = 'error: %s: %s' % (err.__class__.__name__, err)
+            command = 'errors'
+        elapsed = (perf_counter() - received) * 1000
+        with self._lock:
+            metrics = self._metrics
+            metrics['in_flight'] -= 1
+            metrics['requests'] += 1
+            metrics[command] += 1
+            self._handle_ms += elapsed
+            self._max_ms = max(self._max_ms, elapsed)
+        if address:
+            try:
+                self._sock.sendto(answer.encode('utf8'), address)
+            except OSError as err:  # gone already
+                log.debug('no answer to %r: %r', address, err)
+
+    def _player(self, key, make):
+        ''' Return the player kept for key, or make one. '''
+        with self._lock:
+            player = self._players.get(key)
+            if player is not None:
+                self._players.move_to_end(key)
+                return player
+        player = make()
+        with self._lock:
+            self._players[key] = player
+            if len(self._players) > self.max_players:
+                for old_key, old in list(self._players.items()):
+                    if not old._busy():
+                        del self._players[old_key]
+                        break
+        return player
+
+    def _play(self, name):
+        key, make = _sound_player(self._cls, self.bank, name, self._kwargs)
+        self._player(key, make).play()
+
+    def _tone(self, frequency_hz, duration_ms, volume=0.2):
+        cls = self._cls
+        if not cls.in_memory:
+            raise TypeError('%s does not play tones.' % cls.__name__)
+        args = (float(frequency_hz), float(duration_ms), float(volume))
+        make = lambda: cls(PCMBuffer(  # noqa: E731
+            get_tone(*args, sample_rate=22_050, sample_width=2),
+            AudioFormat(22_050, 1, 2),
+        ), **self._kwargs)
+        self._player(('tone',) + args, make).play()
 
+    def _stop(self, name=None):
+        with self._lock:
+            players = [player for key, player in self._players.items()
+                       if name is None or key[1] == name]
+        for player in players:
+            player.stop()
+
+    def _stats(self):
+        import json  # deferred
+
+        return json.dumps(self.stats())
+
+
+def serve(path=None, backend=None, bank=None, **kwargs):
+    ''' Run a PlayerServer until interrupted, see that for arguments. '''
+    server = PlayerServer(path, backend, bank, **kwargs)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
 
 if __name__ == '__main__':
 
     import sys
+    if sys.argv[1:2] and sys.argv[1] in PlayerServer.commands:  # client
+        _answer = request(*sys.argv[1:], reply=True)
+        print(_answer)
+        sys.exit(_answer.startswith('error'))
+
     try:
         import out
         out.configure(level='debug' if '-d' in sys.argv else 'info')
@@ -533,12 +4741,28 @@ if __name__ == '__main__':
             )
     log.debug('boombox version: %s', __version__)
 
+    if sys.argv[1:2] == ['serve']:
+        import argparse
+
+        _parser = argparse.ArgumentParser(prog='python -m boombox serve')
+        _parser.add_argument('-d', action='store_true', help='debug output')
+        _parser.add_argument('--socket', help='path, default: %s'
+                             % _socket_path())
+        _parser.add_argument('--backend', choices=backends())
+        _parser.add_argument('--bank', help='directory or manifest of sounds')
+        _parser.add_argument('--workers', type=int, default=8)
+        _args = _parser.parse_args(sys.argv[2:])
+        serve(_args.socket, _args.backend, _args.bank,
+              max_workers=_args.workers)
+        sys.exit()
+
     if len(sys.argv) > 1 and sys.argv[1] != '-d':
         _sound_file = sys.argv[1]
     else:
         _sound_file = _example_file
 
     log.info('Playing media:… %r', _sound_file)
+    BoomBox = select_backend()
     _boombox = BoomBox(_sound_file, duration_ms=2_000, wait=True)
     _boombox.play()
     log.debug('cutting short…')
@@ -5,8 +5,8 @@ from os.path import dirname, join
 from setuptools import setup
 
 
-if sys.version_info < (3, 6):
-    raise NotImplementedError('Sorry, only Python 3.6 and above is supported.')
+if sys.version_info < (3, 7):
+    raise NotImplementedError('Sorry, only Python 3.7 and above is supported.')
 
 
 def get_version(filename, version='1.00'):
@@ -60,7 +60,7 @@ setup(
 
     extras_require      = extras_require,
     install_requires    = install_requires,
-    python_requires     = '>=3.6',
+    python_requires     = '>=3.7',
     setup_requires      = install_requires,
 
     long_description    = slurp('readme.rst'),
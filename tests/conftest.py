@@ -0,0 +1,190 @@
+''' Test doubles for the audio libraries, so the players run headless.
+
+    FakePyAudio checks what the stream callbacks return the way PyAudio's
+    C code does, "z#i": bytes or None no longer than the buffer, and a
+    flag.  Anything else aborts the stream, as PortAudio would.  Gst is a
+    mock, for what pipelines are built.
+'''
+import sys
+import threading
+import time
+import types
+import wave
+from importlib.machinery import ModuleSpec
+from unittest import mock
+
+import pytest
+
+import boombox
+
+paContinue, paComplete, paAbort = 0, 1, 2
+paOutputUnderflow, paOutputOverflow = 4, 8
+paFloat32, paInt32, paInt24, paInt16, paInt8, paUInt8 = 1, 2, 4, 8, 16, 32
+_SIZES = {paFloat32: 4, paInt32: 4, paInt24: 3, paInt16: 2, paInt8: 1,
+          paUInt8: 1}
+DEVICES = ('speaker', 'pa out')
+
+
+def get_format_from_width(width, unsigned=True):
+    return {1: paUInt8 if unsigned else paInt8, 2: paInt16, 3: paInt24,
+            4: paFloat32}[width]
+
+
+class FakeStream:
+    streams = []  # all opened
+
+    def __init__(self, format, channels, rate, output=True, start=True,
+                 frames_per_buffer=0, stream_callback=None,
+                 output_device_index=None, **kwargs):
+        if output_device_index is not None and \
+           output_device_index >= len(DEVICES):
+            raise OSError('Invalid device')
+        self.frame_size = _SIZES[format] * channels
+        self.rate = rate
+        self.device = output_device_index
+        self.frames_per_buffer = frames_per_buffer or 256
+        self.callback = stream_callback
+        self.played = []  # what the device got
+        self.errors = []  # what PyAudio would have printed
+        self.closed = False
+        self._active = False
+        self._thread = None
+        self.streams.append(self)
+        if start:
+            self.start_stream()
+
+    def start_stream(self):
+        if self.closed:
+            raise OSError('Stream closed')
+        self._active = True
+        if self.callback:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while self._active:
+            frames = self.frames_per_buffer
+            result = self.callback(None, frames, {}, 0)
+            try:
+                data, flag = result
+                if not (data is None or isinstance(data, bytes)):
+                    raise TypeError('a bytes-like object is required, '
+                                    'not %r' % type(data).__name__)
+                if data and len(data) > frames * self.frame_size:
+                    raise ValueError('too much data')
+            except (TypeError, ValueError) as err:
+                self.errors.append(err)
+                break  # paAbort
+            self.played.append(data or b'')
+            if flag != paContinue:
+                break
+            time.sleep(0.0005)
+        self._active = False
+
+    def stop_stream(self):
+        self._active = False
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(1)
+
+    def is_active(self):
+        return self._active
+
+    def is_stopped(self):
+        return not self._active
+
+    def close(self):
+        self.stop_stream()
+        self.closed = True
+
+    def write(self, data, *args, **kwargs):
+        if not isinstance(data, bytes):
+            raise TypeError('bytes required')
+        self.played.append(data)
+
+    def get_output_latency(self):
+        return 0.01
+
+
+class FakePyAudio:
+    def open(self, **kwargs):
+        return FakeStream(**kwargs)
+
+    def terminate(self):
+        pass
+
+    def get_format_from_width(self, width, unsigned=True):
+        return get_format_from_width(width, unsigned)
+
+    def get_sample_size(self, format):
+        return _SIZES[format]
+
+    def get_device_count(self):
+        return len(DEVICES)
+
+    def get_device_info_by_index(self, index):
+        return dict(index=index, name=DEVICES[index], maxOutputChannels=2,
+                    defaultSampleRate=48000.0)
+
+    def get_default_output_device_info(self):
+        return self.get_device_info_by_index(0)
+
+
+@pytest.fixture
+def pyaudio(monkeypatch):
+    ''' Install the fake as pyaudio, with a fresh engine and mixer. '''
+    module = types.ModuleType('pyaudio')
+    module.__spec__ = ModuleSpec('pyaudio', None)
+    for name, value in dict(globals()).items():
+        if name.startswith('pa') and isinstance(value, int):
+            setattr(module, name, value)
+    module.PyAudio = FakePyAudio
+    module.get_format_from_width = get_format_from_width
+    monkeypatch.setitem(sys.modules, 'pyaudio', module)
+    boombox._available.cache_clear()
+    FakeStream.streams = []
+    monkeypatch.setattr(boombox, '_pa_engine', boombox._PyAudioEngine())
+    monkeypatch.setattr(boombox.Mixer, '_shared', None, raising=False)
+    yield FakeStream
+    boombox._available.cache_clear()
+    for stream in FakeStream.streams:
+        stream.close()
+
+
+@pytest.fixture
+def gst(monkeypatch):
+    ''' Replace Gst with a mock, return it and GstBoomBox.  Pipelines are
+        built of mocks and never run, calls on them can be checked.
+    '''
+    Gst = mock.MagicMock(name='Gst')
+    monkeypatch.setattr(boombox, '_gst', lambda: Gst)
+    monkeypatch.setattr(boombox._glib_loop, 'watch', mock.MagicMock())
+    return Gst, boombox._backends['gstreamer'][0]
+
+
+@pytest.fixture
+def wav(tmp_path):
+    ''' A 0.1 s, 22.05 kHz 16-bit stereo WAV file of a ramp. '''
+    path = tmp_path / 'sound.wav'
+    frames = bytes(range(256)) * (22050 * 4 // 10 // 256)
+    with wave.open(str(path), 'wb') as outfile:
+        outfile.setnchannels(2)
+        outfile.setsampwidth(2)
+        outfile.setframerate(22050)
+        outfile.writeframes(frames)
+    return str(path)
+
+
+def played(streams):
+    ''' Check nothing aborted, return all the device streams got. '''
+    for stream in streams:
+        assert not stream.errors, stream.errors
+    return b''.join(b''.join(stream.played) for stream in streams)
+
+
+def run(func, timeout=5):
+    ''' Call func in a thread, failing if it doesn't return in time. '''
+    thread = threading.Thread(target=func, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'hung, %s did not return' % func
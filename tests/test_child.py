@@ -0,0 +1,18 @@
+''' The command-line player's lookup of its binary. '''
+import os
+
+import boombox
+
+
+def test_search_follows_path(tmp_path, monkeypatch):
+    for name in ('a', 'b'):
+        (tmp_path / name).mkdir()
+        binary = tmp_path / name / 'boombox-test-player'
+        binary.write_text('#!/bin/sh\n')
+        binary.chmod(0o755)
+    for name in ('a', 'b'):
+        monkeypatch.setenv('PATH', str(tmp_path / name))
+        assert boombox._search_path('boombox-test-player') == \
+            os.path.join(str(tmp_path / name), 'boombox-test-player')
+    monkeypatch.setenv('PATH', str(tmp_path))
+    assert boombox._search_path('boombox-test-player') is None
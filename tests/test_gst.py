@@ -0,0 +1,60 @@
+''' GstBoomBox tone pipelines, built against a mock Gst. '''
+import pytest
+
+import boombox
+
+
+def test_tone_checks_width(gst, wav):
+    Gst, GstBoomBox = gst
+    with pytest.raises(ValueError):
+        GstBoomBox(wav).play_tone(440, 50, sample_width=3)
+    Gst.parse_launch.assert_not_called()
+
+
+@pytest.mark.parametrize('width, sample_format', [(1, 'U8'), (2, 'S16LE')])
+def test_tone_caps(gst, wav, width, sample_format):
+    Gst, GstBoomBox = gst
+    GstBoomBox(wav).play_tone(440, 50, sample_rate=8000, sample_width=width)
+    Gst.Caps.from_string.assert_called_once_with(
+        'audio/x-raw,format=%s,rate=8000,channels=1' % sample_format)
+
+
+def test_tone_sink_is_tuned(gst, wav):
+    Gst, GstBoomBox = gst
+    GstBoomBox(wav, latency=20, audio_sink='fakesink').play_tone(440, 50)
+    Gst.parse_bin_from_description.assert_called_once_with('fakesink', True)
+    player = Gst.parse_launch.return_value
+    player.connect.assert_any_call('deep-element-added', boombox._tune_sink,
+                                   20000)
+    sink = Gst.parse_bin_from_description.return_value
+    player.add.assert_called_once_with(sink)
+    assert sink.props.buffer_time == 20000
+
+
+def test_tone_pipeline_is_reused(gst, wav):
+    Gst, GstBoomBox = gst
+    player = GstBoomBox(wav)
+    player.play_tone(440, 50)
+    player.play_tone(880, 50)
+    Gst.parse_launch.assert_called_once()
+    Gst.ElementFactory.make.assert_called_once_with('autoaudiosink',
+                                                    'output')
+
+
+def test_sequence_pipeline_is_reused(gst, wav):
+    Gst, GstBoomBox = gst
+    element = Gst.ElementFactory.make('alsasink')
+    Gst.ElementFactory.make.reset_mock()
+    player = GstBoomBox(wav, latency=20, audio_sink=element)
+    player.play_sequence([(440, 50), (880, 50)], sample_width=2)
+    player.play_sequence([(660, 50)], sample_width=2)
+    Gst.parse_launch.assert_called_once_with(
+        'appsrc name=source ! audioconvert ! audioresample name=resample')
+    sink = element.get_factory.return_value.create.return_value
+    pipeline = Gst.parse_launch.return_value
+    pipeline.add.assert_called_once_with(sink)
+    assert sink.props.buffer_time == 20000
+    source = pipeline.get_by_name.return_value
+    assert source.emit.call_count == 4  # a buffer and EOS each
+    assert Gst.Caps.from_string.call_args[0][0].startswith(
+        'audio/x-raw,format=S16LE,rate=22050,channels=1')
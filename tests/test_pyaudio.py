@@ -0,0 +1,98 @@
+''' PyAudioBoomBox against a fake PortAudio that checks callback results. '''
+import asyncio
+
+import pytest
+
+import boombox
+
+from conftest import played, run
+
+
+def test_file_plays_to_the_end(pyaudio, wav):
+    player = boombox.PyAudioBoomBox(wav, wait=True)
+    run(player.play)
+    assert played(pyaudio.streams) == boombox.WavReader(wav).data.tobytes()
+
+
+def test_bank_sound_plays(pyaudio, wav):
+    bank = boombox.SoundBank({'ramp': wav})
+    run(lambda: bank.play('ramp', wait=True,
+                          player=boombox.PyAudioBoomBox))
+    assert played(pyaudio.streams) == bank.get('ramp').data.tobytes()
+
+
+def test_cue_plays_its_segment(pyaudio, wav):
+    player = boombox.PyAudioBoomBox(wav, wait=True, cues={'start': (0, 50)})
+    run(lambda: player.play('start'))
+    frames = boombox.WavReader(wav)
+    assert played(pyaudio.streams) == \
+        frames.data[:frames.format.sample_rate // 20
+                    * frames.format.frame_size].tobytes()
+
+
+def test_native_conversion_plays(pyaudio, wav, monkeypatch):
+    if not (boombox._numpy() or boombox._audioop()):
+        pytest.skip('no NumPy or audioop to convert with')
+    monkeypatch.setattr(boombox, 'conversion_cache',
+                        boombox.ConversionCache())
+    player = boombox.PyAudioBoomBox(wav, wait=True, native=True)
+    run(player.play)
+    assert player._wav_file.format == boombox.AudioFormat(48000, 2, 2)
+    assert pyaudio.streams[-1].rate == 48000
+    assert len(played(pyaudio.streams)) == len(player._wav_file.data)
+
+
+@pytest.mark.parametrize('mixer', [False, True])
+def test_effects_play(pyaudio, wav, mixer):
+    if not (boombox._numpy() or boombox._audioop()):
+        pytest.skip('no NumPy or audioop for effects')
+    effects = boombox.Effects(gain=0.5, pan=0.5, fade_in_ms=20)
+    player = boombox.PyAudioBoomBox(wav, wait=True, effects=effects,
+                                    mixer=mixer or None)
+    run(player.play)
+    data = played(pyaudio.streams)
+    assert data and data != boombox.WavReader(wav).data.tobytes()
+
+
+def test_processed_buffers_are_kept(wav):
+    if not (boombox._numpy() or boombox._audioop()):
+        pytest.skip('no NumPy or audioop for effects')
+    reader = boombox.WavReader(wav)
+    processed = boombox._Processed(reader, boombox.Effects(gain=0.5))
+    first = processed.read(64)
+    copy = bytes(first)
+    processed.read(64)
+    assert isinstance(first, bytes) and first == copy
+
+
+def test_devices_all_play(pyaudio, wav):
+    player = boombox.PyAudioBoomBox(wav, wait=True,
+                                    devices=[0, 'pa out', 'missing', 7])
+    run(player.play)
+    assert [stream.device for stream in pyaudio.streams] == [0, 1]
+    data = boombox.WavReader(wav).data.tobytes()
+    for stream in pyaudio.streams:
+        assert played([stream]) == data
+
+
+def test_queue_plays_gapless(pyaudio, wav):
+    queue = boombox.PlaybackQueue('pyaudio')
+    queue.enqueue(wav, wav)
+    assert queue.wait(5)
+    queue.close()  # joins the stream, done is set before its last buffer
+    data = boombox.WavReader(wav).data.tobytes()
+    assert played(pyaudio.streams).startswith(data + data)
+
+
+def test_completion_on_the_running_loop(pyaudio, wav):
+    player = boombox.PyAudioBoomBox(wav)
+    with pytest.raises(RuntimeError):  # no loop running
+        player.completion()
+
+    async def play():
+        done = player.completion()
+        player.play()
+        await asyncio.wait_for(done, 5)
+
+    asyncio.run(play())
+    assert played(pyaudio.streams) == boombox.WavReader(wav).data.tobytes()
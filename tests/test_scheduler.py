@@ -0,0 +1,23 @@
+''' Scheduler voice limits, counted at the mixer, not just in stats(). '''
+import wave
+
+import boombox
+
+
+def test_restart_replaces_its_voice(pyaudio, tmp_path):
+    path = str(tmp_path / 'long.wav')
+    with wave.open(path, 'wb') as outfile:  # long enough to outlast the test
+        outfile.setnchannels(2)
+        outfile.setsampwidth(2)
+        outfile.setframerate(22050)
+        outfile.writeframes(bytes(22050 * 4 * 10))
+    scheduler = boombox.Scheduler('pyaudio', max_voices=1, window_ms=0,
+                                  mixer=True)
+    try:
+        for _ in range(3):
+            assert scheduler.play(path) is not None
+        assert boombox.Mixer.shared().active == 1
+        assert scheduler.stats()['voices'] == 1
+    finally:
+        scheduler.stop()
+    assert boombox.Mixer.shared().active == 0
@@ -0,0 +1,33 @@
+''' request() against a bare datagram socket standing in for the server. '''
+import os
+import socket
+import stat
+import sys
+import threading
+
+import boombox
+
+
+def test_reply_socket_is_private(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'platform', 'darwin')  # no autobind
+    path = str(tmp_path / 'server.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(path)
+    senders = []
+
+    def answer():
+        message, sender = server.recvfrom(1024)
+        senders.append((sender, stat.S_IMODE(
+            os.stat(os.path.dirname(sender)).st_mode)))
+        server.sendto(b'ok ' + message, sender)
+
+    thread = threading.Thread(target=answer, daemon=True)
+    thread.start()
+    try:
+        assert boombox.request('stats', path=path, reply=True) == 'ok stats'
+    finally:
+        thread.join(2)
+        server.close()
+    [(sender, mode)] = senders
+    assert mode == 0o700
+    assert not os.path.exists(os.path.dirname(sender))  # removed on close